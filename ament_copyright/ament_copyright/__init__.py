@@ -12,8 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import pkg_resources
 
+import re
 
 COPYRIGHT_GROUP = 'ament_copyright.copyright_name'
 LICENSE_GROUP = 'ament_copyright.license'
@@ -33,22 +33,86 @@ ALL_FILETYPES = {
 UNKNOWN_IDENTIFIER = '<unknown>'
 
 
+# entry points are only being loaded once per process
+_loaded_entry_points = {}
+_copyright_names = None
+_copyright_name_index = None
+
+
 def get_copyright_names():
-    names = {}
-    for entry_point in pkg_resources.iter_entry_points(
-            group=COPYRIGHT_GROUP):
-        assert entry_point.name != UNKNOWN_IDENTIFIER, \
-            "Invalid entry point name '%s'" % entry_point.name
-        name = entry_point.load()
-        names[entry_point.name] = name
-    return names
+    """
+    Get the name of each known copyright holder.
+
+    A copyright name entry point can either be a single name or a list of
+    names where the first one is being used as the name of the copyright
+    holder and the others are aliases.
+    """
+    global _copyright_names
+    if _copyright_names is None:
+        _copyright_names = {
+            identifier: get_copyright_name_aliases(value)[0]
+            for identifier, value in load_entry_points(COPYRIGHT_GROUP).items()}
+    return _copyright_names
+
+
+def get_copyright_name_index():
+    """
+    Get a mapping from normalized copyright holder names to their identifier.
+
+    The mapping contains the names as well as the aliases of all known
+    copyright holders normalized with `normalize_copyright_name`.
+    If multiple copyright holders share a normalized name the first one wins.
+    """
+    global _copyright_name_index
+    if _copyright_name_index is None:
+        _copyright_name_index = {}
+        for identifier, value in load_entry_points(COPYRIGHT_GROUP).items():
+            for name in get_copyright_name_aliases(value):
+                _copyright_name_index.setdefault(
+                    normalize_copyright_name(name), identifier)
+    return _copyright_name_index
+
+
+def get_copyright_name_aliases(value):
+    if isinstance(value, str):
+        return [value]
+    return list(value)
+
+
+def normalize_copyright_name(name):
+    """Normalize a name ignoring case, whitespaces and punctuation."""
+    return ' '.join(re.sub(r'[\W_]+', ' ', name.lower()).split())
 
 
 def get_licenses():
-    licenses = {}
-    for entry_point in pkg_resources.iter_entry_points(
-            group=LICENSE_GROUP):
-        assert entry_point.name != UNKNOWN_IDENTIFIER, \
-            "Invalid entry point name '%s'" % entry_point.name
-        licenses[entry_point.name] = entry_point.load()
-    return licenses
+    return load_entry_points(LICENSE_GROUP)
+
+
+def load_entry_points(group):
+    """
+    Load all entry points of a group.
+
+    The result is cached and the same dictionary is returned on subsequent
+    calls, therefore it must not be modified by the caller.
+    """
+    if group not in _loaded_entry_points:
+        loaded = {}
+        for entry_point in iter_entry_points(group):
+            assert entry_point.name != UNKNOWN_IDENTIFIER, \
+                "Invalid entry point name '%s'" % entry_point.name
+            loaded[entry_point.name] = entry_point.load()
+        _loaded_entry_points[group] = loaded
+    return _loaded_entry_points[group]
+
+
+def iter_entry_points(group):
+    # avoid the expensive import of pkg_resources if possible
+    try:
+        from importlib.metadata import entry_points
+    except ImportError:
+        import pkg_resources
+        return pkg_resources.iter_entry_points(group=group)
+    all_entry_points = entry_points()
+    if hasattr(all_entry_points, 'select'):
+        return all_entry_points.select(group=group)
+    return all_entry_points.get(group, [])
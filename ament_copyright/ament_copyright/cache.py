@@ -0,0 +1,172 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import sqlite3
+
+from ament_copyright import COPYRIGHT_GROUP
+from ament_copyright import get_licenses
+from ament_copyright import load_entry_points
+from ament_copyright import SOURCE_FILETYPE
+from ament_copyright.parser import determine_filetype
+from ament_copyright.parser import get_parse_results
+from ament_copyright.parser import restore_parse_results
+
+# increment when the format of the stored results changes
+CACHE_FORMAT_VERSION = 3
+
+# the number of results which are written to the database in one transaction
+WRITE_BATCH_SIZE = 100
+
+# the time in seconds to wait for another process writing to the database
+BUSY_TIMEOUT = 60
+
+
+class ResultCache:
+    """
+    Persistent cache of the parse results of source files.
+
+    The results are keyed by the hash of the file content as well as a
+    fingerprint of the package modules and the registered copyright names and
+    licenses.
+    The hash of each file is stored together with its modification time and
+    size so that only files which have changed need to be hashed again.
+    The results are written in short transactions of up to WRITE_BATCH_SIZE
+    files, so that concurrent runs can share the database and an interrupted
+    run keeps most of its results.
+    """
+
+    def __init__(self, path):
+        self.hits = 0
+        self.misses = 0
+        self.fingerprint = get_fingerprint()
+        # the stat information and hash of files which were not in the cache
+        self._pending = {}
+        # the rows which haven't been written to the database yet
+        self._files = []
+        self._results = []
+
+        dirname = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(dirname):
+            os.makedirs(dirname)
+        # transactions are only started explicitly when writing
+        self._connection = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS files '
+            '(path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, hash TEXT)')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, data TEXT)')
+
+    def close(self):
+        self._flush()
+        self._connection.close()
+
+    def lookup(self, path):
+        """Return a descriptor with the cached results or None if not cached."""
+        if determine_filetype(path) != SOURCE_FILETYPE:
+            return None
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        row = self._connection.execute(
+            'SELECT mtime_ns, size, hash FROM files WHERE path = ?', (path, )
+        ).fetchone()
+        if row is not None and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+            file_hash = row[2]
+            file_changed = False
+        else:
+            file_hash = get_file_hash(path)
+            file_changed = True
+
+        row = self._connection.execute(
+            'SELECT data FROM results WHERE key = ?',
+            (self._get_key(file_hash), )
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            self._pending[path] = (stat.st_mtime_ns, stat.st_size, file_hash)
+            return None
+
+        self.hits += 1
+        if file_changed:
+            self._store_file(path, stat.st_mtime_ns, stat.st_size, file_hash)
+        return restore_parse_results(path, json.loads(row[0]))
+
+    def store(self, file_descriptor):
+        """Store the results of a parsed file which was not in the cache."""
+        if file_descriptor is None or file_descriptor.filetype != SOURCE_FILETYPE:
+            return
+        pending = self._pending.pop(file_descriptor.path, None)
+        if pending is None:
+            return
+        mtime_ns, size, file_hash = pending
+        self._results.append((
+            self._get_key(file_hash), json.dumps(get_parse_results(file_descriptor))))
+        self._store_file(file_descriptor.path, mtime_ns, size, file_hash)
+
+    def _store_file(self, path, mtime_ns, size, file_hash):
+        self._files.append((path, mtime_ns, size, file_hash))
+        if len(self._files) >= WRITE_BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if not self._files and not self._results:
+            return
+        self._connection.execute('BEGIN IMMEDIATE')
+        try:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO results (key, data) VALUES (?, ?)',
+                self._results)
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO files (path, mtime_ns, size, hash) '
+                'VALUES (?, ?, ?, ?)', self._files)
+        except BaseException:
+            self._connection.execute('ROLLBACK')
+            raise
+        self._connection.execute('COMMIT')
+        self._files = []
+        self._results = []
+
+    def _get_key(self, file_hash):
+        return '%s:%s' % (self.fingerprint, file_hash)
+
+
+def get_file_hash(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def get_fingerprint():
+    """Get a hash of the ament_copyright modules, copyright names and license headers."""
+    h = hashlib.sha1()
+    h.update(str(CACHE_FORMAT_VERSION).encode())
+    # the parse results also change with the code of the package
+    package_path = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package_path)):
+        if name.endswith('.py'):
+            h.update(name.encode())
+            h.update(get_file_hash(os.path.join(package_path, name)).encode())
+    for name, copyright_name in sorted(load_entry_points(COPYRIGHT_GROUP).items()):
+        h.update(repr((name, copyright_name)).encode())
+    for name, license_ in sorted(get_licenses().items()):
+        h.update(repr((name, license_.file_header)).encode())
+    return h.hexdigest()
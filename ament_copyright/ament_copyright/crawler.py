@@ -22,30 +22,7 @@ def get_files(paths, extensions, skip_package_level_setup_py=True):
     files = {}
     for path in paths:
         if os.path.isdir(path):
-            if is_repository_root(path):
-                add_files_for_all_filetypes(path, files)
-            for dirpath, dirnames, filenames in os.walk(path):
-                if 'AMENT_IGNORE' in filenames:
-                    dirnames[:] = []
-                    continue
-                if is_repository_root(dirpath):
-                    add_files_for_all_filetypes(dirpath, files)
-
-                # ignore folder starting with . or _
-                dirnames[:] = [d for d in dirnames if d[0] not in ['.', '_']]
-                dirnames.sort()
-
-                # select files by extension
-                for filename in sorted(filenames):
-                    # skip package level setup.py file
-                    if (
-                        skip_package_level_setup_py and
-                        filename == 'setup.py' and
-                        os.path.exists(os.path.join(dirpath, 'package.xml'))
-                    ):
-                        continue
-                    if match_filename(filename, extensions):
-                        files[os.path.join(dirpath, filename)] = SOURCE_FILETYPE
+            add_files_in_directory(path, extensions, files, skip_package_level_setup_py)
 
         if os.path.isfile(path) and match_filename(path, extensions):
             files[path] = SOURCE_FILETYPE
@@ -59,6 +36,61 @@ def get_files(paths, extensions, skip_package_level_setup_py=True):
     return {os.path.normpath(path): filetype for path, filetype in files.items()}
 
 
+def add_files_in_directory(path, extensions, files, skip_package_level_setup_py):
+    """
+    Add the files of a directory recursively.
+
+    The entries of each directory are only listed once and reused to detect
+    repository roots, ignored directories and package level setup.py files
+    without any additional file system access.
+    """
+    suffixes = {'.%s' % e for e in extensions}
+    # directories are being visited in sorted order
+    dirpaths = [path]
+    while dirpaths:
+        dirpath = dirpaths.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        names = {entry.name for entry in entries}
+
+        if '.git' in names or '.hg' in names:
+            # the passed path is considered even if it is being ignored
+            if dirpath == path or 'AMENT_IGNORE' not in names:
+                add_files_for_all_filetypes(dirpath, files)
+        if 'AMENT_IGNORE' in names:
+            continue
+
+        dirnames = []
+        filenames = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if not is_dir:
+                filenames.append(entry.name)
+            # ignore folder starting with . or _ and symlinks to folders
+            elif entry.name[0] not in ['.', '_'] and not entry.is_symlink():
+                dirnames.append(entry.name)
+
+        # select files by extension
+        for filename in filenames:
+            # skip package level setup.py file
+            if (
+                skip_package_level_setup_py and
+                filename == 'setup.py' and
+                'package.xml' in names
+            ):
+                continue
+            if os.path.splitext(filename)[1] in suffixes:
+                files[os.path.join(dirpath, filename)] = SOURCE_FILETYPE
+
+        dirpaths += [os.path.join(dirpath, d) for d in sorted(dirnames, reverse=True)]
+
+
 def is_repository_root(path):
     """Check if the path is the root of a git or mercurial repository."""
     return (
@@ -0,0 +1,130 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+import subprocess
+import tempfile
+
+
+def get_years_from_git_history(paths):
+    """
+    Get the years in which each file was modified according to git.
+
+    The history of each repository is only read once using a single
+    'git log' invocation, independent of the number of files.
+    Files which are not part of a git repository or have no history are
+    mapped to an empty set.
+    A RuntimeError is raised if the history of a repository can't be read.
+    """
+    years_by_path = {path: set() for path in paths}
+
+    # group the files by repository root
+    paths_by_root = {}
+    repository_roots = {}
+    for path in paths:
+        dirname = os.path.dirname(os.path.abspath(path))
+        root = find_repository_root(dirname, repository_roots)
+        if root is None:
+            continue
+        relpath = os.path.relpath(os.path.abspath(path), root)
+        relpath = relpath.replace(os.sep, '/')
+        paths_by_root.setdefault(root, {})[relpath] = path
+
+    for root in sorted(paths_by_root.keys()):
+        relpaths = paths_by_root[root]
+        for relpath, years in read_git_log(root, relpaths.keys()):
+            years_by_path[relpaths[relpath]] |= years
+    return years_by_path
+
+
+def find_repository_root(dirname, repository_roots):
+    """Find the closest ancestor containing a '.git' entry, caching all visited directories."""
+    visited = []
+    root = None
+    while True:
+        if dirname in repository_roots:
+            root = repository_roots[dirname]
+            break
+        visited.append(dirname)
+        if os.path.exists(os.path.join(dirname, '.git')):
+            root = dirname
+            break
+        parent = os.path.dirname(dirname)
+        if parent == dirname:
+            break
+        dirname = parent
+    for dirname in visited:
+        repository_roots[dirname] = root
+    return root
+
+
+def read_git_log(root, relpaths):
+    """
+    Read the years in which the files were modified from the log of a repository.
+
+    The output of 'git log' is parsed incrementally while it is being
+    generated.
+    The paths are separated by NUL characters, so they are neither quoted nor
+    required to be valid UTF-8.
+    Only the years of the passed relative paths are being collected.
+    """
+    relpaths = set(relpaths)
+    years_by_relpath = {}
+    cmd = ['git', 'log', '-z', '--format=%x00%ad', '--date=short', '--name-only']
+    # stderr is written to a file since reading it only after stdout could
+    # block git once the stderr pipe is full
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            proc = subprocess.Popen(cmd, cwd=root, stdout=subprocess.PIPE, stderr=stderr)
+        except OSError as e:
+            raise RuntimeError("Failed to invoke '%s': %s" % (' '.join(cmd), e))
+
+        # each commit is '\0yyyy-mm-dd\0' followed by '\n' and the paths
+        # each terminated by '\0', since paths are never empty an empty token
+        # is always followed by the date of the next commit
+        year = None
+        is_date = False
+        is_first_path = False
+        with proc.stdout:
+            for token in split_nul_separated(proc.stdout):
+                if not token:
+                    is_date = True
+                elif is_date:
+                    year = int(token[:4])
+                    is_date = False
+                    is_first_path = True
+                else:
+                    if is_first_path:
+                        # strip the newline between the date and the paths
+                        token = token[1:]
+                        is_first_path = False
+                    relpath = os.fsdecode(token)
+                    if relpath in relpaths:
+                        years_by_relpath.setdefault(relpath, set()).add(year)
+        if proc.wait():
+            stderr.seek(0)
+            raise RuntimeError("Failed to read the git history of '%s': %s" % (
+                root, stderr.read().decode('utf-8', 'replace').strip()))
+    return years_by_relpath.items()
+
+
+def split_nul_separated(stream, chunk_size=65536):
+    """Yield the NUL separated tokens of a binary stream while reading it."""
+    pending = b''
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        tokens = (pending + chunk).split(b'\0')
+        pending = tokens.pop()
+        yield from tokens
+    if pending:
+        yield pending
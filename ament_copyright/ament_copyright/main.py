@@ -13,10 +13,14 @@
 # limitations under the License.
 
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
 from itertools import groupby
 import os
 import re
+import shutil
 import sys
+import tempfile
 import time
 from xml.sax.saxutils import escape
 from xml.sax.saxutils import quoteattr
@@ -27,13 +31,21 @@ from ament_copyright import get_licenses
 from ament_copyright import LICENSE_FILETYPE
 from ament_copyright import SOURCE_FILETYPE
 from ament_copyright import UNKNOWN_IDENTIFIER
+from ament_copyright.cache import ResultCache
 from ament_copyright.crawler import get_files
-from ament_copyright.parser import get_comment_block
+from ament_copyright.history import get_years_from_git_history
+from ament_copyright.parser import COPYRIGHT_REGEX
+from ament_copyright.parser import find_comment_block
 from ament_copyright.parser import get_index_of_next_line
+from ament_copyright.parser import get_parse_results
+from ament_copyright.parser import LineIndex
 from ament_copyright.parser import parse_file
+from ament_copyright.parser import restore_parse_results
 from ament_copyright.parser import scan_past_coding_and_shebang_lines
 from ament_copyright.parser import scan_past_empty_lines
-from ament_copyright.parser import search_copyright_information
+from ament_copyright.rewrite import apply_edits
+from ament_copyright.rewrite import FileEdit
+from ament_copyright.rewrite import get_patch
 
 
 def main(argv=sys.argv[1:]):
@@ -85,6 +97,27 @@ def main(argv=sys.argv[1:]):
         '--verbose',
         action='store_true',
         help='Show all files instead of only the ones with errors / modifications')
+    parser.add_argument(
+        '--years-from-git',
+        action='store_true',
+        help='Add the years in which each file was modified according to the '
+             'git history instead of the current year (only used with '
+             '--add-copyright-year)')
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Output a unified diff of the modifications instead of applying '
+             'them (only used with --add-missing and --add-copyright-year)')
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='The number of processes used to parse the files and threads '
+             'used to write modified files (0 to use the number of CPUs)')
+    parser.add_argument(
+        '--cache-file',
+        help='Cache the results of unchanged source files in this SQLite '
+             'database (only used when checking the files)')
     # not using a file handle directly
     # in order to prevent leaving an empty file when something fails early
     group.add_argument(
@@ -114,109 +147,205 @@ def main(argv=sys.argv[1:]):
         print('No repository roots and files found', file=sys.stderr)
         return 0
 
-    file_descriptors = {}
-    for filename in sorted(filenames):
-        file_descriptors[filename] = parse_file(filename)
-
     if args.add_missing:
         name = names.get(args.add_missing[0], args.add_missing[0])
         if args.add_missing[1] not in licenses:
             parser.error(
                 "'LICENSE' argument must be a known license name. "
                 "Use the '--list-licenses' options to see alist of valid license names.")
-        add_missing_header(
-            file_descriptors, name, licenses[args.add_missing[1]], args.verbose)
+        file_descriptors = dict(parse_files(sorted(filenames), args.jobs))
+        with get_edit_output(args.dry_run):
+            edits = add_missing_header(
+                file_descriptors, name, licenses[args.add_missing[1]], args.verbose)
+        apply_or_output_edits(edits, args.dry_run, args.jobs)
         return 0
 
     if args.add_copyright_year is not None:
-        if not args.add_copyright_year:
+        file_descriptors = dict(parse_files(sorted(filenames), args.jobs))
+        years_by_path = None
+        if args.years_from_git:
+            try:
+                years_by_path = get_years_from_git_history(file_descriptors.keys())
+            except RuntimeError as e:
+                print(str(e), file=sys.stderr)
+                return 1
+        elif not args.add_copyright_year:
             args.add_copyright_year.append(time.strftime('%Y'))
         args.add_copyright_year = [int(year) for year in args.add_copyright_year]
-        add_copyright_year(file_descriptors, args.add_copyright_year, args.verbose)
+        with get_edit_output(args.dry_run):
+            edits = add_copyright_year(
+                file_descriptors, args.add_copyright_year, args.verbose,
+                years_by_path=years_by_path)
+        apply_or_output_edits(edits, args.dry_run, args.jobs)
         return 0
 
-    report = []
+    xunit_writer = None
+    if args.xunit_file:
+        folder_name = os.path.basename(os.path.dirname(args.xunit_file))
+        file_name = os.path.basename(args.xunit_file)
+        suffix = '.xml'
+        if file_name.endswith(suffix):
+            file_name = file_name[0:-len(suffix)]
+            suffix = '.xunit'
+            if file_name.endswith(suffix):
+                file_name = file_name[0:-len(suffix)]
+        testname = '%s.%s' % (folder_name, file_name)
+        xunit_writer = XunitWriter(args.xunit_file, testname)
+
+    cache = None
+    if args.cache_file:
+        cache = ResultCache(args.cache_file)
+
+    file_count = 0
+    error_count = 0
+    try:
+        # check each directory for CONTRIBUTING.md and LICENSE files
+        for path, file_descriptor in parse_files(
+            sorted(filenames), args.jobs, cache, keep_content=False
+        ):
+            has_error, message = check_file(file_descriptor)
+            if args.verbose or has_error:
+                print('%s: %s' % (file_descriptor.path, message),
+                      file=sys.stderr if has_error else sys.stdout)
+            file_count += 1
+            if has_error:
+                error_count += 1
+            if xunit_writer:
+                xunit_writer.add_testcase(file_descriptor.path, not has_error, message)
+    finally:
+        if cache:
+            cache.close()
+    if cache and args.verbose:
+        print('Cache hits: %d, misses: %d' % (cache.hits, cache.misses))
 
-    # check each directory for CONTRIBUTING.md and LICENSE files
-    for path in sorted(file_descriptors.keys()):
-        file_descriptor = file_descriptors[path]
-        message = None
-        has_error = False
+    # output summary
+    if not error_count:
+        print('No problems found, checked %d files' % file_count)
+        rc = 0
+    else:
+        print('%d errors, checked %d files' % (error_count, file_count), file=sys.stderr)
+        rc = 1
 
-        if file_descriptor.filetype == SOURCE_FILETYPE:
-            if not file_descriptor.exists:
-                message = 'file not found'
-                has_error = True
+    # generate xunit file
+    if xunit_writer:
+        xunit_writer.close(time.time() - start_time)
 
-            elif not file_descriptor.content:
-                message = 'file empty'
+    return rc
 
-            elif not file_descriptor.copyright_identifiers:
-                message = 'could not find copyright notice'
-                has_error = True
 
-            else:
-                message = 'copyright=%s, license=%s' % \
-                    (', '.join([str(c) for c in file_descriptor.copyrights]),
-                     file_descriptor.license_identifier)
-                has_error = file_descriptor.license_identifier == UNKNOWN_IDENTIFIER
+def check_file(file_descriptor):
+    """Return if the file has an error as well as the message describing the result."""
+    message = None
+    has_error = False
 
-        elif file_descriptor.filetype in [CONTRIBUTING_FILETYPE, LICENSE_FILETYPE]:
-            if not file_descriptor.exists:
-                message = 'file not found'
-                has_error = True
+    if file_descriptor.filetype == SOURCE_FILETYPE:
+        if not file_descriptor.exists:
+            message = 'file not found'
+            has_error = True
 
-            elif not file_descriptor.content:
-                message = 'file empty'
-                has_error = True
+        elif file_descriptor.is_empty():
+            message = 'file empty'
 
-            elif file_descriptor.license_identifier:
-                message = file_descriptor.license_identifier
-                has_error = file_descriptor.license_identifier == UNKNOWN_IDENTIFIER
+        elif not file_descriptor.copyright_identifiers:
+            message = 'could not find copyright notice'
+            has_error = True
 
-            else:
-                assert False, file_descriptor
+        else:
+            message = 'copyright=%s, license=%s' % \
+                (', '.join([str(c) for c in file_descriptor.copyrights]),
+                 file_descriptor.license_identifier)
+            has_error = file_descriptor.license_identifier == UNKNOWN_IDENTIFIER
+
+    elif file_descriptor.filetype in [CONTRIBUTING_FILETYPE, LICENSE_FILETYPE]:
+        if not file_descriptor.exists:
+            message = 'file not found'
+            has_error = True
+
+        elif file_descriptor.is_empty():
+            message = 'file empty'
+            has_error = True
+
+        elif file_descriptor.license_identifier:
+            message = file_descriptor.license_identifier
+            has_error = file_descriptor.license_identifier == UNKNOWN_IDENTIFIER
 
         else:
-            assert False, 'Unknown filetype: ' + file_descriptor.filetype
+            assert False, file_descriptor
 
-        if args.verbose or has_error:
-            print('%s: %s' % (file_descriptor.path, message),
-                  file=sys.stderr if has_error else sys.stdout)
-        report.append((file_descriptor.path, not has_error, message))
+    else:
+        assert False, 'Unknown filetype: ' + file_descriptor.filetype
 
-    # output summary
-    error_count = len([r for r in report if not r[1]])
-    if not error_count:
-        print('No problems found, checked %d files' % len(report))
-        rc = 0
+    return has_error, message
+
+
+def parse_files(filenames, jobs=1, cache=None, keep_content=True):
+    """
+    Parse the files, optionally in parallel using a pool of processes.
+
+    The tuples of filenames and descriptors are yielded as soon as they are
+    available in the order of the passed filenames independent of the number
+    of jobs.
+    If a cache is passed only the files which are not in the cache are parsed.
+    Unless the content is kept the worker processes only return the parse
+    results needed to check the files instead of the whole descriptors.
+    """
+    cached_descriptors = {}
+    if cache:
+        for filename in filenames:
+            file_descriptor = cache.lookup(filename)
+            if file_descriptor is not None:
+                cached_descriptors[filename] = file_descriptor
+    uncached_filenames = [f for f in filenames if f not in cached_descriptors]
+
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs < 2 or len(uncached_filenames) < 2:
+        executor = None
+        parsed_descriptors = map(parse_file, uncached_filenames)
     else:
-        print('%d errors, checked %d files' % (error_count, len(report)), file=sys.stderr)
-        rc = 1
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        # pass multiple files to each worker at once to reduce the IPC overhead
+        chunksize = max(1, len(uncached_filenames) // (jobs * 4))
+        if keep_content:
+            parsed_descriptors = executor.map(
+                parse_file, uncached_filenames, chunksize=chunksize)
+        else:
+            parsed_descriptors = map(
+                restore_parse_results, uncached_filenames, executor.map(
+                    parse_file_results, uncached_filenames, chunksize=chunksize))
 
-    # generate xunit file
-    if args.xunit_file:
-        folder_name = os.path.basename(os.path.dirname(args.xunit_file))
-        file_name = os.path.basename(args.xunit_file)
-        suffix = '.xml'
-        if file_name.endswith(suffix):
-            file_name = file_name[0:-len(suffix)]
-            suffix = '.xunit'
-            if file_name.endswith(suffix):
-                file_name = file_name[0:-len(suffix)]
-        testname = '%s.%s' % (folder_name, file_name)
+    try:
+        for filename in filenames:
+            file_descriptor = cached_descriptors.pop(filename, None)
+            if file_descriptor is None:
+                file_descriptor = next(parsed_descriptors)
+                if cache:
+                    cache.store(file_descriptor)
+            yield filename, file_descriptor
+    finally:
+        if executor:
+            executor.shutdown()
 
-        xml = get_xunit_content(report, testname, time.time() - start_time)
-        path = os.path.dirname(os.path.abspath(args.xunit_file))
-        if not os.path.exists(path):
-            os.makedirs(path)
-        with open(args.xunit_file, 'w', encoding='utf-8') as f:
-            f.write(xml)
 
-    return rc
+def parse_file_results(path):
+    """Parse a file and return only the parse results needed to check it."""
+    return get_parse_results(parse_file(path))
+
+
+def get_edit_output(dry_run):
+    # keep the patch on stdout free of the list of modified files
+    return redirect_stdout(sys.stderr if dry_run else sys.stdout)
+
+
+def apply_or_output_edits(edits, dry_run, jobs):
+    if dry_run:
+        print(get_patch(edits), end='')
+    else:
+        apply_edits(edits, jobs)
 
 
 def add_missing_header(file_descriptors, name, license_, verbose):
+    """Get the edits adding the copyright / license to the files lacking it."""
     copyright_ = 'Copyright %d %s' % (int(time.strftime('%Y')) - 1 + 1, name)
     header = license_.file_header.format(**{'copyright': copyright_})
     lines = header.splitlines()
@@ -227,6 +356,7 @@ def add_missing_header(file_descriptors, name, license_, verbose):
             print('+', line)
         print()
 
+    edits = []
     for path in sorted(file_descriptors.keys()):
         file_descriptor = file_descriptors[path]
         skip = False
@@ -249,77 +379,105 @@ def add_missing_header(file_descriptors, name, license_, verbose):
 
         if file_descriptor.filetype == SOURCE_FILETYPE:
             print('*', file_descriptor.path)
-            add_header(file_descriptor, header)
+            content = add_header(file_descriptor, header)
+            edits.append(FileEdit(file_descriptor.path, file_descriptor.content, content))
 
         elif file_descriptor.filetype == CONTRIBUTING_FILETYPE:
             print('+', file_descriptor.path)
-            with open(file_descriptor.path, 'w', encoding='utf-8') as h:
-                h.write(license_.contributing_file)
+            edits.append(FileEdit(file_descriptor.path, None, license_.contributing_file))
 
         elif file_descriptor.filetype == LICENSE_FILETYPE:
             print('+', file_descriptor.path)
-            with open(file_descriptor.path, 'w', encoding='utf-8') as h:
-                h.write(license_.license_file)
+            edits.append(FileEdit(file_descriptor.path, None, license_.license_file))
 
         else:
             assert False, 'Unknown filetype: ' + file_descriptor.filetype
 
+    return edits
 
-def add_copyright_year(file_descriptors, new_years, verbose):
+
+def add_copyright_year(file_descriptors, new_years, verbose, years_by_path=None):
+    """
+    Get the edits adding the new years to the existing copyright notices.
+
+    If a mapping of paths to years is passed the years of each file are being
+    added in addition to the new years.
+    """
     if verbose:
         print('Adding the current year to existing copyright notices:')
         print()
 
+    edits = []
     for path in sorted(file_descriptors.keys()):
         file_descriptor = file_descriptors[path]
 
         # ignore files which do not have a header
-        if not getattr(file_descriptor, 'copyright_identifier', None):
+        if not getattr(file_descriptor, 'copyright_identifiers', None):
             continue
 
-        index = scan_past_coding_and_shebang_lines(file_descriptor.content)
-        index = scan_past_empty_lines(file_descriptor.content, index)
+        # the whole file is needed to rewrite it
+        if not file_descriptor.content_complete:
+            file_descriptor.read()
 
-        if file_descriptor.filetype == SOURCE_FILETYPE:
-            block, block_offset = get_comment_block(file_descriptor.content, index)
-            if not block:
-                assert False, "Could not find comment block in file '%s'" % file_descriptor.path
-        else:
-            block = file_descriptor.content[index:]
-            block_offset = 0
-        copyright_span, years_span, name_span = search_copyright_information(block)
-        if copyright_span is None:
+        line_index = LineIndex(file_descriptor.content)
+        index = scan_past_coding_and_shebang_lines(file_descriptor.content, line_index)
+        index = scan_past_empty_lines(file_descriptor.content, index, line_index)
+
+        years_span = get_copyright_years_span(file_descriptor.content, index, line_index)
+        if years_span is None:
             assert False, "Could not find copyright information in file '%s'" % \
                 file_descriptor.path
 
+        file_new_years = set(new_years)
+        if years_by_path is not None:
+            file_new_years |= years_by_path.get(path, set())
+
         # skip if all new years are already included
-        years = get_years_from_string(block[years_span[0]:years_span[1]])
-        if all((new_year in years) for new_year in new_years):
+        years = get_years_from_string(
+            file_descriptor.content[years_span[0]:years_span[1]])
+        if all((new_year in years) for new_year in file_new_years):
             if verbose:
                 print(' ', file_descriptor.path)
             continue
         print('*' if file_descriptor.exists else '+', file_descriptor.path)
 
-        for new_year in new_years:
+        for new_year in file_new_years:
             years.add(new_year)
         years_string = get_string_from_years(years)
 
         # overwrite previous years with new years
-        offset = index + block_offset
-        global_years_span = [offset + years_span[0], offset + years_span[1]]
-        content = file_descriptor.content[:global_years_span[0]] + years_string + \
-            file_descriptor.content[global_years_span[1]:]
+        content = file_descriptor.content[:years_span[0]] + years_string + \
+            file_descriptor.content[years_span[1]:]
 
         # output beginning of file for debugging
-        # index = global_years_span[0]
+        # index = years_span[0]
         # for _ in range(3):
         #     index = get_index_of_next_line(content, index)
         # print('<<<')
         # print(content[:index - 1])
         # print('>>>')
 
-        with open(file_descriptor.path, 'w', encoding='utf-8') as h:
-            h.write(content)
+        edits.append(FileEdit(file_descriptor.path, file_descriptor.content, content))
+
+    return edits
+
+
+def get_copyright_years_span(content, index, line_index):
+    """Get the span of the years of the first copyright notice in the first comment block."""
+    comment_token, start_index, end_index = find_comment_block(content, index, line_index)
+    if comment_token is None:
+        return None
+
+    line_start = start_index
+    while line_start < end_index:
+        line_end = get_index_of_next_line(content, line_start, line_index)
+        # skip the comment token as well as the following whitespace
+        text_start = line_start + len(comment_token) + 1
+        match = COPYRIGHT_REGEX.search(content[text_start:line_end])
+        if match:
+            return [text_start + match.start(1), text_start + match.end(1)]
+        line_start = line_end
+    return None
 
 
 def get_years_from_string(content):
@@ -358,15 +516,20 @@ def get_string_from_years(years):
 
 def add_header(file_descriptor, header):
     """
-    Add the copyright / license message to a file.
+    Get the content of a file with the copyright / license message added.
 
     The copyright / license is placed below an optional shebang line as
     well as an optional coding line.
     It is preceded by an empty line if not at the beginning of the file
     and always followed by an empty line.
     """
-    begin_index = scan_past_coding_and_shebang_lines(file_descriptor.content)
-    end_index = scan_past_empty_lines(file_descriptor.content, begin_index)
+    # the whole file is needed to rewrite it
+    if not file_descriptor.content_complete:
+        file_descriptor.read()
+
+    line_index = LineIndex(file_descriptor.content)
+    begin_index = scan_past_coding_and_shebang_lines(file_descriptor.content, line_index)
+    end_index = scan_past_empty_lines(file_descriptor.content, begin_index, line_index)
 
     # inject copyright message
     comment = get_comment(file_descriptor.path, header)
@@ -384,8 +547,7 @@ def add_header(file_descriptor, header):
     # print(content[:index - 1])
     # print('>>>')
 
-    with open(file_descriptor.path, 'w', encoding='utf-8') as h:
-        h.write(content)
+    return content
 
 
 def get_comment(filename, msg):
@@ -409,16 +571,77 @@ def get_comment(filename, msg):
     return comment
 
 
+class XunitWriter:
+    """
+    Write a xunit file incrementally.
+
+    The testcases are written to temporary files while the files are being
+    checked.
+    The xunit file is only assembled when being closed since the counts in the
+    testsuite header are not known before.
+    """
+
+    def __init__(self, path, testname):
+        self.path = path
+        self.testname = testname
+        self.test_count = 0
+        self.error_count = 0
+        self._testcases = tempfile.TemporaryFile('w+', encoding='utf-8')
+        self._escaped_files = tempfile.TemporaryFile('w+', encoding='utf-8')
+
+    def add_testcase(self, filename, no_error, message):
+        self.test_count += 1
+        if not no_error:
+            self.error_count += 1
+        self._testcases.write(
+            get_xunit_testcase(filename, no_error, message, self.testname))
+        self._escaped_files.write(escape('\n* %s' % filename))
+
+    def close(self, elapsed):
+        path = os.path.dirname(os.path.abspath(self.path))
+        if not os.path.exists(path):
+            os.makedirs(path)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(get_xunit_header(
+                self.testname, self.test_count, self.error_count, elapsed))
+            self._testcases.seek(0)
+            shutil.copyfileobj(self._testcases, f)
+            # output list of checked files
+            f.write('  <system-out>Checked files:')
+            self._escaped_files.seek(0)
+            shutil.copyfileobj(self._escaped_files, f)
+            f.write('</system-out>\n')
+            f.write('</testsuite>\n')
+        self._testcases.close()
+        self._escaped_files.close()
+
+
 def get_xunit_content(report, testname, elapsed):
-    test_count = len(report)
-    error_count = len([r for r in report if not r[1]])
+    xml = [get_xunit_header(
+        testname, len(report), len([r for r in report if not r[1]]), elapsed)]
+
+    for (filename, no_error, message) in report:
+        xml.append(get_xunit_testcase(filename, no_error, message, testname))
+
+    # output list of checked files
+    data = {
+        'escaped_files': escape(''.join(['\n* %s' % r[0] for r in report])),
+    }
+    xml.append("""  <system-out>Checked files:%(escaped_files)s</system-out>
+""" % data)
+
+    xml.append('</testsuite>\n')
+    return ''.join(xml)
+
+
+def get_xunit_header(testname, test_count, error_count, elapsed):
     data = {
         'testname': testname,
         'test_count': test_count,
         'error_count': error_count,
         'time': '%.3f' % round(elapsed, 3),
     }
-    xml = """<?xml version="1.0" encoding="UTF-8"?>
+    return """<?xml version="1.0" encoding="UTF-8"?>
 <testsuite
   name="%(testname)s"
   tests="%(test_count)d"
@@ -427,16 +650,16 @@ def get_xunit_content(report, testname, elapsed):
 >
 """ % data
 
-    for (filename, no_error, message) in report:
 
-        data = {
-            'quoted_filename': quoteattr(filename),
-            'testname': testname,
-            'escaped_message': escape(message),
-        }
-        if not no_error:
-            # report missing / unknown copyright / license as a failing testcase
-            xml += """  <testcase
+def get_xunit_testcase(filename, no_error, message, testname):
+    data = {
+        'quoted_filename': quoteattr(filename),
+        'testname': testname,
+        'escaped_message': escape(message),
+    }
+    if not no_error:
+        # report missing / unknown copyright / license as a failing testcase
+        return """  <testcase
     name=%(quoted_filename)s
     classname="%(testname)s"
   >
@@ -444,24 +667,13 @@ def get_xunit_content(report, testname, elapsed):
   </testcase>
 """ % data
 
-        else:
-            # if there is a known copyright / license report a single successful test
-            xml += """  <testcase
+    # if there is a known copyright / license report a single successful test
+    return """  <testcase
     name=%(quoted_filename)s
     classname="%(testname)s"
     status="%(escaped_message)s"/>
 """ % data
 
-    # output list of checked files
-    data = {
-        'escaped_files': escape(''.join(['\n* %s' % r[0] for r in report])),
-    }
-    xml += """  <system-out>Checked files:%(escaped_files)s</system-out>
-""" % data
-
-    xml += '</testsuite>\n'
-    return xml
-
 
 if __name__ == '__main__':
     sys.exit(main())
@@ -12,17 +12,31 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from bisect import bisect_right
 import os
 import re
 
 from ament_copyright import ALL_FILETYPES
 from ament_copyright import CONTRIBUTING_FILETYPE
-from ament_copyright import get_copyright_names
+from ament_copyright import get_copyright_name_index
 from ament_copyright import get_licenses
 from ament_copyright import LICENSE_FILETYPE
+from ament_copyright import normalize_copyright_name
 from ament_copyright import SOURCE_FILETYPE
 from ament_copyright import UNKNOWN_IDENTIFIER
 
+# regex for matching years or year ranges (yyyy-yyyy) separated by colons
+_YEAR = r'\d{4}'
+_YEAR_RANGE = '%s-%s' % (_YEAR, _YEAR)
+_YEAR_OR_YEAR_RANGE = '(?:%s|%s)' % (_YEAR, _YEAR_RANGE)
+COPYRIGHT_REGEX = re.compile(
+    r'^[^\n\r]?\s*(?:\\copyright\s*)?'
+    r'Copyright(?:\s+\(c\))?\s+(%s(?:,\s*%s)*),?\s+([^\n\r]+)$' %
+    (_YEAR_OR_YEAR_RANGE, _YEAR_OR_YEAR_RANGE), re.DOTALL | re.MULTILINE)
+
+# number of characters initially read when only the header of a file is needed
+HEADER_WINDOW_SIZE = 16 * 1024
+
 
 class CopyrightDescriptor:
 
@@ -44,6 +58,7 @@ class FileDescriptor:
         self.path = path
         self.exists = os.path.exists(path)
         self.content = None
+        self.content_complete = False
         self.license_identifier = UNKNOWN_IDENTIFIER
 
     def read(self):
@@ -51,6 +66,32 @@ class FileDescriptor:
             return
         with open(self.path, 'r', encoding='utf-8') as h:
             self.content = h.read()
+        self.content_complete = True
+
+    def read_header(self, window_size=HEADER_WINDOW_SIZE):
+        """
+        Read the beginning of the file up to the end of the first comment block.
+
+        The file is read in chunks of increasing size until the first comment
+        block ends before the end of the content read so far.
+        If the file is read completely the content is marked as complete.
+        """
+        if not self.exists:
+            return
+        with open(self.path, 'r', encoding='utf-8') as h:
+            self.content = ''
+            while True:
+                chunk = h.read(window_size)
+                self.content += chunk
+                if len(chunk) < window_size:
+                    self.content_complete = True
+                    break
+                if is_header_complete(self.content):
+                    break
+                window_size *= 2
+
+    def is_empty(self):
+        return not self.content
 
     def parse(self):
         raise NotImplementedError()
@@ -59,22 +100,9 @@ class FileDescriptor:
         if content is None:
             return
 
-        for name, license_ in get_licenses().items():
-            template = remove_formatting(getattr(license_, license_part))
-            last_index = -1
-            for license_section in template.split('{copyright_holder}'):
-                # OK, now look for each section of the license in the incoming
-                # content.
-                index = remove_formatting(content).find(license_section.strip())
-                if index == -1 or index <= last_index:
-                    # Some part of the license is not in the content, or the license
-                    # is rearranged, this license doesn't match.
-                    break
-                last_index = index
-            else:
-                # We found the license, so set it
-                self.license_identifier = name
-                break
+        name = get_license_matcher().match(content, license_part)
+        if name is not None:
+            self.license_identifier = name
 
 
 class SourceDescriptor(FileDescriptor):
@@ -87,27 +115,24 @@ class SourceDescriptor(FileDescriptor):
         self.copyright_identifiers = []
 
     def identify_copyright(self):
-        known_copyrights = get_copyright_names()
+        known_copyrights = get_copyright_name_index()
         for c in self.copyrights:
-            found_name = c.name
-            for identifier, name in known_copyrights.items():
-                if name == found_name:
-                    self.copyright_identifiers.append(identifier)
-                    break
-            else:
-                self.copyright_identifiers.append(UNKNOWN_IDENTIFIER)
+            self.copyright_identifiers.append(known_copyrights.get(
+                normalize_copyright_name(c.name), UNKNOWN_IDENTIFIER))
 
     def parse(self):
-        self.read()
+        self.read_header()
         if not self.content:
             return
 
+        line_index = LineIndex(self.content)
+
         # skip over coding and shebang lines
-        index = scan_past_coding_and_shebang_lines(self.content)
-        index = scan_past_empty_lines(self.content, index)
+        index = scan_past_coding_and_shebang_lines(self.content, line_index)
+        index = scan_past_empty_lines(self.content, index, line_index)
 
         # get first comment block without leading comment tokens
-        block, _ = get_comment_block(self.content, index)
+        block, _ = get_comment_block(self.content, index, line_index)
         if not block:
             return
         copyrights, remaining_block = search_copyright_information(block)
@@ -148,6 +173,104 @@ class LicenseDescriptor(FileDescriptor):
         self.identify_license(self.content, 'license_file')
 
 
+class ParsedFileDescriptor(FileDescriptor):
+    """
+    The parse results of a file without its content.
+
+    It is restored from the results of a file which was parsed in another
+    process or stored in a cache.
+    """
+
+    def __init__(self, filetype, path, exists, empty):
+        super(ParsedFileDescriptor, self).__init__(filetype, path)
+        self.exists = exists
+        self.empty = empty
+        self.copyrights = []
+        self.copyright_identifiers = []
+
+    def parse(self):
+        pass
+
+    def is_empty(self):
+        return self.empty
+
+
+def get_parse_results(file_descriptor):
+    """Get the parse results of a file needed to check it as plain values."""
+    return {
+        'filetype': file_descriptor.filetype,
+        'exists': file_descriptor.exists,
+        'empty': file_descriptor.is_empty(),
+        'copyrights': [
+            [c.name, c.year_range]
+            for c in getattr(file_descriptor, 'copyrights', [])],
+        'copyright_identifiers': list(
+            getattr(file_descriptor, 'copyright_identifiers', [])),
+        'license_identifier': file_descriptor.license_identifier,
+    }
+
+
+def restore_parse_results(path, results):
+    """Create a descriptor from the parse results of a file."""
+    file_descriptor = ParsedFileDescriptor(
+        results['filetype'], path, results['exists'], results['empty'])
+    file_descriptor.copyrights = [
+        CopyrightDescriptor(name, year_range)
+        for name, year_range in results['copyrights']]
+    file_descriptor.copyright_identifiers = results['copyright_identifiers']
+    file_descriptor.license_identifier = results['license_identifier']
+    return file_descriptor
+
+
+class LicenseMatcher:
+    """
+    Match content against the templates of all known licenses.
+
+    The templates are normalized and split into their sections once when the
+    matcher is created so that each file only needs to be normalized once.
+    """
+
+    LICENSE_PARTS = ('file_header', 'license_file', 'contributing_file')
+
+    def __init__(self, licenses):
+        self.templates = {part: [] for part in self.LICENSE_PARTS}
+        for name, license_ in licenses.items():
+            for part in self.LICENSE_PARTS:
+                template = remove_formatting(getattr(license_, part))
+                sections = [
+                    section.strip()
+                    for section in template.split('{copyright_holder}')]
+                self.templates[part].append((name, sections))
+
+    def match(self, content, license_part):
+        """Return the name of the first license matching the content or None."""
+        content = remove_formatting(content)
+        for name, sections in self.templates[license_part]:
+            last_index = -1
+            for section in sections:
+                # OK, now look for each section of the license in the incoming
+                # content.
+                index = content.find(section)
+                if index == -1 or index <= last_index:
+                    # Some part of the license is not in the content, or the license
+                    # is rearranged, this license doesn't match.
+                    break
+                last_index = index
+            else:
+                return name
+        return None
+
+
+_license_matcher = None
+
+
+def get_license_matcher():
+    global _license_matcher
+    if _license_matcher is None:
+        _license_matcher = LicenseMatcher(get_licenses())
+    return _license_matcher
+
+
 def parse_file(path):
     filetype = determine_filetype(path)
     if filetype == SOURCE_FILETYPE:
@@ -171,41 +294,51 @@ def determine_filetype(path):
 
 
 def search_copyright_information(content):
-    # regex for matching years or year ranges (yyyy-yyyy) separated by colons
-    year = r'\d{4}'
-    year_range = '%s-%s' % (year, year)
-    year_or_year_range = '(?:%s|%s)' % (year, year_range)
-    pattern = r'^[^\n\r]?\s*(?:\\copyright\s*)?' \
-              r'Copyright(?:\s+\(c\))?\s+(%s(?:,\s*%s)*),?\s+([^\n\r]+)$' % \
-        (year_or_year_range, year_or_year_range)
-    regex = re.compile(pattern, re.DOTALL | re.MULTILINE)
-
     copyrights = []
-    while True:
-        match = regex.search(content)
-        if not match:
-            break
-        years_span, name_span = match.span(1), match.span(2)
-        years = content[years_span[0]:years_span[1]]
-        name = content[name_span[0]:name_span[1]]
+    end_index = 0
+    for match in COPYRIGHT_REGEX.finditer(content):
+        years, name = match.group(1, 2)
         copyrights.append(CopyrightDescriptor(name, years))
-        content = content[name_span[1]:]
+        end_index = match.end(2)
 
-    return copyrights, content
+    return copyrights, content[end_index:]
 
 
-def scan_past_coding_and_shebang_lines(content):
+def scan_past_coding_and_shebang_lines(content, line_index=None):
     index = 0
     while (
         is_comment_line(content, index) and
-        (is_coding_line(content, index) or
+        (is_coding_line(content, index, line_index) or
          is_shebang_line(content, index))
     ):
-        index = get_index_of_next_line(content, index)
+        index = get_index_of_next_line(content, index, line_index)
     return index
 
 
-def get_index_of_next_line(content, index):
+class LineIndex:
+    """
+    The offsets of the beginning of each line of a text.
+
+    The offsets are computed once so that finding the beginning of the next
+    line doesn't need to search the remaining text again.
+    """
+
+    NEWLINE_REGEX = re.compile('\r\n|\r|\n')
+
+    def __init__(self, content):
+        self.length = len(content)
+        self.line_starts = [m.end() for m in self.NEWLINE_REGEX.finditer(content)]
+
+    def get_index_of_next_line(self, index):
+        i = bisect_right(self.line_starts, index)
+        if i == len(self.line_starts):
+            return self.length
+        return self.line_starts[i]
+
+
+def get_index_of_next_line(content, index, line_index=None):
+    if line_index is not None:
+        return line_index.get_index_of_next_line(index)
     index_n = content.find('\n', index)
     index_r = content.find('\r', index)
     index_rn = content.find('\r\n', index)
@@ -228,11 +361,11 @@ def is_comment_line(content, index):
     # skip over optional BOM
     if index == 0 and content[0] == '\ufeff':
         index = 1
-    return content[index] == '#' or content[index:index + 1] == '//'
+    return content.startswith('#', index) or content[index:index + 1] == '//'
 
 
-def is_coding_line(content, index):
-    end_index = get_index_of_next_line(content, index)
+def is_coding_line(content, index, line_index=None):
+    end_index = get_index_of_next_line(content, index, line_index)
     line = content[index:end_index]
     return 'coding=' in line or 'coding:' in line
 
@@ -244,7 +377,20 @@ def is_shebang_line(content, index):
     return content[index:index + 2] == '#!'
 
 
-def get_comment_block(content, index):
+def get_comment_block(content, index, line_index=None):
+    comment_token, start_index, end_index = find_comment_block(content, index, line_index)
+    if comment_token is None:
+        return None, None
+
+    block = content[start_index:end_index]
+    lines = block.splitlines()
+    lines = [line[len(comment_token) + 1:] for line in lines]
+
+    return '\n'.join(lines), start_index + len(comment_token) + 1
+
+
+def find_comment_block(content, index, line_index=None):
+    """Return the comment token as well as the start and end index of the first comment block."""
     # regex for matching the beginning of the first comment
     # check for doxygen comments (///) before regular comments (//)
     pattern = '^(#|///|//)'
@@ -255,31 +401,41 @@ def get_comment_block(content, index):
 
     match = regex.search(content, index)
     if not match:
-        return None, None
+        return None, None, None
     comment_token = match.group(1)
     start_index = match.start(1)
 
     end_index = start_index
     while True:
-        end_index = get_index_of_next_line(content, end_index)
+        end_index = get_index_of_next_line(content, end_index, line_index)
         if content[end_index:end_index + len(comment_token)] != comment_token:
             break
 
-    block = content[start_index:end_index]
-    lines = block.splitlines()
-    lines = [line[len(comment_token) + 1:] for line in lines]
+    return comment_token, start_index, end_index
 
-    return '\n'.join(lines), start_index + len(comment_token) + 1
+
+def is_header_complete(content):
+    """Check if the first comment block ends before the end of the partial content."""
+    line_index = LineIndex(content)
+    index = scan_past_coding_and_shebang_lines(content, line_index)
+    index = scan_past_empty_lines(content, index, line_index)
+    if index >= len(content):
+        return False
+    comment_token, _, end_index = find_comment_block(content, index, line_index)
+    if comment_token is None:
+        return False
+    # the following line must be long enough to tell it is not a comment
+    return end_index + len(comment_token) < len(content)
 
 
-def scan_past_empty_lines(content, index):
-    while is_empty_line(content, index):
-        index = get_index_of_next_line(content, index)
+def scan_past_empty_lines(content, index, line_index=None):
+    while is_empty_line(content, index, line_index):
+        index = get_index_of_next_line(content, index, line_index)
     return index
 
 
-def is_empty_line(content, index):
-    return get_index_of_next_line(content, index) == index + 1
+def is_empty_line(content, index, line_index=None):
+    return get_index_of_next_line(content, index, line_index) == index + 1
 
 
 def remove_formatting(text):
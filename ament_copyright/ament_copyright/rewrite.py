@@ -0,0 +1,121 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import difflib
+import os
+import shutil
+import tempfile
+
+# the old content is None if the file doesn't exist yet
+FileEdit = namedtuple('FileEdit', ['path', 'old_content', 'new_content'])
+
+
+def apply_edits(edits, jobs=1):
+    """
+    Write the new content of all edited files.
+
+    Each file is written to a temporary file in the same directory which then
+    replaces the original file, so an interrupted run never leaves truncated
+    files behind.
+    Symlinks are resolved so the target is replaced.
+    Files with several hardlinks or which owner can't be preserved are written
+    in place instead.
+    Files which content doesn't change are not being written.
+    """
+    edits = [e for e in edits if e.new_content != e.old_content]
+
+    # the umask is process wide so it is only queried once
+    umask = os.umask(0)
+    os.umask(umask)
+
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs < 2 or len(edits) < 2:
+        for edit in edits:
+            write_file_atomically(edit.path, edit.new_content, umask)
+        return
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = [
+            executor.submit(write_file_atomically, edit.path, edit.new_content, umask)
+            for edit in edits]
+        for future in futures:
+            future.result()
+
+
+def write_file_atomically(path, content, umask):
+    # replace the target of a symlink rather than the link itself
+    path = os.path.realpath(path)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        stat = None
+    if stat is not None and stat.st_nlink > 1:
+        # replacing the file would break its other hardlinks
+        write_file(path, content)
+        return
+
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), prefix='.%s.' % os.path.basename(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as h:
+            h.write(content)
+        if stat is None:
+            # use the same permissions as a file created with open()
+            os.chmod(tmp_path, 0o666 & ~umask)
+        else:
+            tmp_stat = os.stat(tmp_path)
+            if (tmp_stat.st_uid, tmp_stat.st_gid) != (stat.st_uid, stat.st_gid):
+                try:
+                    os.chown(tmp_path, stat.st_uid, stat.st_gid)
+                except (AttributeError, OSError):
+                    # the owner can't be preserved when replacing the file
+                    os.remove(tmp_path)
+                    write_file(path, content)
+                    return
+            shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_file(path, content):
+    with open(path, 'w', encoding='utf-8') as h:
+        h.write(content)
+
+
+def get_patch(edits):
+    """Get a unified diff of all edited files which content changes."""
+    patch = []
+    for edit in edits:
+        if edit.new_content == edit.old_content:
+            continue
+        if edit.old_content is None:
+            old_lines = []
+            from_file = '/dev/null'
+        else:
+            old_lines = edit.old_content.splitlines(keepends=True)
+            from_file = 'a/' + edit.path
+        new_lines = edit.new_content.splitlines(keepends=True)
+        for line in difflib.unified_diff(
+            old_lines, new_lines, fromfile=from_file, tofile='b/' + edit.path
+        ):
+            patch.append(line)
+            if not line.endswith('\n'):
+                patch.append('\n\\ No newline at end of file\n')
+    return ''.join(patch)
@@ -12,9 +12,31 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import os
+import re
+import shutil
+import subprocess
 
+from ament_copyright import cache
+from ament_copyright import get_copyright_name_index
+from ament_copyright import get_licenses
+from ament_copyright import normalize_copyright_name
+from ament_copyright.crawler import get_files
+from ament_copyright.history import get_years_from_git_history
+from ament_copyright.main import check_file
+from ament_copyright.main import get_xunit_content
 from ament_copyright.main import main
+from ament_copyright.main import XunitWriter
+from ament_copyright.parser import get_index_of_next_line
+from ament_copyright.parser import get_parse_results
+from ament_copyright.parser import HEADER_WINDOW_SIZE
+from ament_copyright.parser import LicenseMatcher
+from ament_copyright.parser import LineIndex
+from ament_copyright.parser import parse_file
+from ament_copyright.parser import restore_parse_results
+from ament_copyright.parser import search_copyright_information
+import pytest
 
 
 cases_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'cases')
@@ -33,3 +55,255 @@ def test_bsd_indented():
 def test_bsd_tabs():
     rc = main(argv=[os.path.join(cases_path, 'bsd_license_tabs')])
     assert rc == 0, 'Found errors'
+
+
+def test_license_matcher():
+    licenses = get_licenses()
+    matcher = LicenseMatcher(licenses)
+    for name, license_ in licenses.items():
+        assert matcher.match(license_.license_file, 'license_file') == name
+        assert matcher.match(license_.contributing_file, 'contributing_file') == name
+    assert matcher.match('no license here', 'file_header') is None
+
+
+def test_header_window(tmp_path):
+    path = tmp_path / 'large.py'
+    header = '# Copyright 2019 Open Source Robotics Foundation, Inc.\n'
+    body = 'x = 1\n' * (HEADER_WINDOW_SIZE // 2)
+    path.write_text(header + body, encoding='utf-8')
+
+    file_descriptor = parse_file(str(path))
+    assert not file_descriptor.content_complete
+    assert len(file_descriptor.content) < len(header + body)
+    assert file_descriptor.copyright_identifiers == ['osrf']
+
+    file_descriptor.read()
+    assert file_descriptor.content_complete
+    assert file_descriptor.content == header + body
+
+
+def test_jobs(tmp_path):
+    xunit_file = tmp_path / 'copyright.xunit.xml'
+    contents = []
+    for jobs in ('1', '2'):
+        rc = main(argv=['--jobs', jobs, '--xunit-file', str(xunit_file), cases_path])
+        assert rc == 0, 'Found errors'
+        content = xunit_file.read_text(encoding='utf-8')
+        contents.append(re.sub(r'time="[^"]*"', '', content))
+    assert contents[0] == contents[1]
+
+
+def test_parse_results(tmp_path):
+    (tmp_path / 'empty.py').write_text('', encoding='utf-8')
+    (tmp_path / 'LICENSE').write_text('', encoding='utf-8')
+    paths = [
+        os.path.join(cases_path, 'bsd_license', 'case.py'), str(tmp_path / 'empty.py'),
+        str(tmp_path / 'missing.py'), str(tmp_path / 'LICENSE')]
+    for path in paths:
+        file_descriptor = parse_file(path)
+        results = get_parse_results(file_descriptor)
+        # the results are plain values without the content of the file
+        assert json.loads(json.dumps(results)) == results
+        restored = restore_parse_results(path, results)
+        assert check_file(restored) == check_file(file_descriptor)
+
+
+def test_cache(tmp_path, capsys):
+    cache_file = str(tmp_path / 'copyright_cache.db')
+    outputs = []
+    for _ in range(2):
+        rc = main(argv=['--cache-file', cache_file, '--verbose', cases_path])
+        assert rc == 0, 'Found errors'
+        outputs.append(capsys.readouterr().out)
+    assert 'Cache hits: 0, misses: 3' in outputs[0]
+    assert 'Cache hits: 3, misses: 0' in outputs[1]
+    assert outputs[0].splitlines()[:-2] == outputs[1].splitlines()[:-2]
+
+
+def test_cache_concurrent(tmp_path, monkeypatch):
+    monkeypatch.setattr(cache, 'WRITE_BATCH_SIZE', 1, raising=False)
+    cache_file = str(tmp_path / 'copyright_cache.db')
+    filenames = sorted(get_files([cases_path], ['py']))
+    assert len(filenames) == 3
+    # both caches write results while the other one is still open
+    caches = [cache.ResultCache(cache_file) for _ in range(2)]
+    try:
+        for i, filename in enumerate(filenames):
+            result_cache = caches[i % 2]
+            assert result_cache.lookup(filename) is None
+            result_cache.store(parse_file(filename))
+        # the written results are visible to the other cache
+        for result_cache in caches:
+            for filename in filenames:
+                assert result_cache.lookup(filename) is not None
+    finally:
+        for result_cache in caches:
+            result_cache.close()
+
+
+def test_cache_fingerprint(tmp_path, monkeypatch):
+    fingerprint = cache.get_fingerprint()
+    assert cache.get_fingerprint() == fingerprint
+
+    # the cached results are invalidated when the code of the package changes
+    package_path = tmp_path / 'ament_copyright'
+    shutil.copytree(os.path.dirname(cache.__file__), str(package_path))
+    monkeypatch.setattr(cache, '__file__', str(package_path / 'cache.py'))
+    assert cache.get_fingerprint() == fingerprint
+    with (package_path / 'parser.py').open('a') as h:
+        h.write('\n')
+    assert cache.get_fingerprint() != fingerprint
+
+
+def test_many_copyright_lines():
+    lines = ['Copyright %d Contributor %d' % (2000 + i % 20, i) for i in range(1000)]
+    block = '\n'.join(lines) + '\n\nLicense text\n'
+    copyrights, remaining_block = search_copyright_information(block)
+    assert [str(c) for c in copyrights] == [
+        'Contributor %d (%d)' % (i, 2000 + i % 20) for i in range(1000)]
+    assert remaining_block == '\n\nLicense text\n'
+
+
+def test_line_index():
+    for content in ('', 'a', 'a\nb\r\nc\rd', '\n\r\n\r', '#!/usr/bin/env python3\n# x\r\n'):
+        line_index = LineIndex(content)
+        for index in range(len(content) + 1):
+            assert get_index_of_next_line(content, index, line_index) == \
+                get_index_of_next_line(content, index)
+
+
+def test_copyright_name_index():
+    index = get_copyright_name_index()
+    for name in (
+        'Open Source Robotics Foundation, Inc.',
+        'open source robotics foundation inc',
+        'Open  Source Robotics Foundation,Inc',
+    ):
+        assert index.get(normalize_copyright_name(name)) == 'osrf'
+    assert normalize_copyright_name('Unknown Holder') not in index
+
+
+def test_add_copyright_year(tmp_path, capsys):
+    path = tmp_path / 'case.cpp'
+    content = (
+        '// Copyright 2015-2016 Open Source Robotics Foundation, Inc.\n'
+        '//\n'
+        '// Licensed under the Apache License, Version 2.0 (the "License");\n'
+        '\n'
+        'int x;\n')
+    path.write_text(content, encoding='utf-8')
+
+    rc = main(argv=['--add-copyright-year', '2017', '2019', '--dry-run', '--', str(path)])
+    assert rc == 0
+    patch = capsys.readouterr().out
+    assert '-// Copyright 2015-2016 Open' in patch
+    assert '+// Copyright 2015-2017, 2019 Open' in patch
+    assert path.read_text(encoding='utf-8') == content
+
+    rc = main(argv=['--add-copyright-year', '2017', '2019', '--', str(path)])
+    assert rc == 0
+    assert path.read_text(encoding='utf-8') == content.replace('2015-2016', '2015-2017, 2019')
+
+    # the file isn't written if the years are already included
+    mtime = path.stat().st_mtime_ns
+    rc = main(argv=['--add-copyright-year', '2017', '--', str(path)])
+    assert rc == 0
+    assert path.stat().st_mtime_ns == mtime
+
+
+def test_add_copyright_year_links(tmp_path):
+    content = (
+        '// Copyright 2016 Open Source Robotics Foundation, Inc.\n'
+        '//\n'
+        '// Licensed under the Apache License, Version 2.0 (the "License");\n'
+        '\n'
+        'int x;\n')
+    target = tmp_path / 'target.cpp'
+    target.write_text(content, encoding='utf-8')
+    target.chmod(0o640)
+    symlink = tmp_path / 'symlink.cpp'
+    os.symlink(str(target), str(symlink))
+    hardlink = tmp_path / 'hardlink.cpp'
+    os.link(str(target), str(hardlink))
+
+    # the target of the symlink is updated and the links are preserved
+    rc = main(argv=['--add-copyright-year', '2017', '--', str(symlink)])
+    assert rc == 0
+    assert symlink.is_symlink()
+    assert target.stat().st_nlink == 2
+    assert target.stat().st_mode & 0o777 == 0o640
+    for path in (symlink, target, hardlink):
+        assert path.read_text(encoding='utf-8') == content.replace('2016', '2016-2017')
+
+    # a file with a single link is replaced and keeps its permissions
+    hardlink.unlink()
+    rc = main(argv=['--add-copyright-year', '2018', '--', str(symlink)])
+    assert rc == 0
+    assert symlink.is_symlink()
+    assert target.stat().st_mode & 0o777 == 0o640
+    assert symlink.read_text(encoding='utf-8') == content.replace('2016', '2016-2018')
+
+
+def test_get_files(tmp_path):
+    for path in (
+        '.git/config', 'a.py', 'b.txt', 'pkg/package.xml', 'pkg/setup.py',
+        'pkg/src/c.cpp', 'pkg/.hidden/d.py', 'pkg/_private/e.py',
+        'ignored/AMENT_IGNORE', 'ignored/f.py', 'other/setup.py',
+    ):
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).touch()
+
+    files = get_files([str(tmp_path)], ['cpp', 'py'])
+    assert {os.path.relpath(f, str(tmp_path)) for f in files} == {
+        'CONTRIBUTING.md', 'LICENSE', 'a.py', os.path.join('pkg', 'src', 'c.cpp'),
+        os.path.join('other', 'setup.py')}
+
+
+@pytest.mark.skipif(shutil.which('git') is None, reason='git is not available')
+def test_years_from_git_history(tmp_path):
+    def git(*args, date=None):
+        env = dict(os.environ)
+        if date:
+            env['GIT_AUTHOR_DATE'] = date
+        subprocess.check_call(
+            ['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com'] +
+            list(args), cwd=str(tmp_path), env=env)
+
+    path = tmp_path / 'case.cpp'
+    other_path = tmp_path / 'other.cpp'
+    git('init', '-q')
+    path.write_text('int x;\n', encoding='utf-8')
+    git('add', '.')
+    git('commit', '-q', '-m', 'first', date='2016-05-01T00:00:00')
+    path.write_text('int y;\n', encoding='utf-8')
+    other_path.write_text('int z;\n', encoding='utf-8')
+    git('add', '.')
+    git('commit', '-q', '-m', 'second', date='2018-05-01T00:00:00')
+
+    years_by_path = get_years_from_git_history([str(path), str(other_path)])
+    assert years_by_path == {str(path): {2016, 2018}, str(other_path): {2018}}
+
+    # file names which git would quote without -z
+    quoted_paths = [tmp_path / 'a"b.cpp', tmp_path / 'tab\there.cpp']
+    for quoted_path in quoted_paths:
+        quoted_path.write_text('int q;\n', encoding='utf-8')
+    git('add', '.')
+    git('commit', '-q', '-m', 'third', date='2019-05-01T00:00:00')
+    git('commit', '-q', '--allow-empty', '-m', 'empty', date='2020-05-01T00:00:00')
+
+    years_by_path = get_years_from_git_history([str(p) for p in quoted_paths])
+    assert years_by_path == {str(p): {2019} for p in quoted_paths}
+
+
+def test_xunit_writer(tmp_path):
+    report = [
+        ('a.py', True, 'copyright=Foo (2019), license=apache2'),
+        ('b & c.py', False, 'could not find copyright notice'),
+    ]
+    xunit_file = tmp_path / 'copyright.xunit.xml'
+    xunit_writer = XunitWriter(str(xunit_file), 'test.copyright')
+    for filename, no_error, message in report:
+        xunit_writer.add_testcase(filename, no_error, message)
+    xunit_writer.close(1.0)
+    assert xunit_file.read_text(encoding='utf-8') == \
+        get_xunit_content(report, 'test.copyright', 1.0)
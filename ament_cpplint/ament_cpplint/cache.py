@@ -0,0 +1,187 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import hashlib
+import json
+import os
+import sqlite3
+
+from ament_cpplint import cpplint
+
+# increment when the format of the stored results changes
+CACHE_FORMAT_VERSION = 1
+
+# the number of rows which are written to the database in one transaction
+WRITE_BATCH_SIZE = 100
+
+# the time in seconds to wait for another process writing to the database
+BUSY_TIMEOUT = 60
+
+
+class ResultCache:
+    """
+    Persistent cache of the results of checked files.
+
+    The results are keyed by the hash of the file content, the cpplint
+    arguments (which contain the filters, the line length and the root), the
+    CPPLINT.cfg files applying to the file, the repository root and a hash of
+    the ament_cpplint modules.
+    Each result also stores the hashes of the headers which cpplint read while
+    checking the file and is only used as long as those haven't changed.
+    The hash of each file is stored together with its modification time and
+    size so that only files which have changed need to be hashed again.
+    The rows are written in short transactions of up to WRITE_BATCH_SIZE rows,
+    so that concurrent runs can share the database and an interrupted run
+    keeps most of its results.
+    """
+
+    def __init__(self, path):
+        self.hits = 0
+        self.misses = 0
+        self.fingerprint = get_module_fingerprint()
+        # the keys of files which were not in the cache
+        self._pending = {}
+        # the hashes of the files which have been looked up in this run
+        self._hashes = {}
+        # the rows which haven't been written to the database yet
+        self._files = []
+        self._results = []
+
+        dirname = os.path.dirname(os.path.abspath(path))
+        if not os.path.exists(dirname):
+            os.makedirs(dirname)
+        # transactions are only started explicitly when writing
+        self._connection = sqlite3.connect(
+            path, timeout=BUSY_TIMEOUT, isolation_level=None)
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS files '
+            '(path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, hash TEXT)')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, data TEXT)')
+
+    def close(self):
+        self._flush()
+        self._connection.close()
+
+    def lookup(self, arguments, filename):
+        """Return the cached data of a file or None if not cached."""
+        file_hash = self._get_file_hash(filename)
+        if file_hash is None:
+            return None
+        key = self._get_key(arguments, filename, file_hash)
+        row = self._connection.execute(
+            'SELECT data FROM results WHERE key = ?', (key, )
+        ).fetchone()
+        data = json.loads(row[0]) if row is not None else None
+        if data is None or any(
+            self._get_file_hash(path) != dependency_hash
+            for path, dependency_hash in data['dependencies']
+        ):
+            self.misses += 1
+            self._pending[filename] = key
+            return None
+
+        self.hits += 1
+        return data
+
+    def store(self, filename, data, dependencies):
+        """
+        Store the data of a checked file which was not in the cache.
+
+        The dependencies are the paths of the other files which have been read
+        while checking the file.
+        """
+        key = self._pending.pop(filename, None)
+        if key is None:
+            return
+        data = dict(data)
+        data['dependencies'] = [
+            [path, self._get_file_hash(path)] for path in sorted(set(dependencies))]
+        self._results.append((key, json.dumps(data)))
+        self._flush_if_needed()
+
+    def _get_file_hash(self, path):
+        """Get the hash of a file or None if it doesn't exist."""
+        if path in self._hashes:
+            return self._hashes[path]
+        try:
+            stat = os.stat(path)
+        except OSError:
+            file_hash = None
+        else:
+            row = self._connection.execute(
+                'SELECT mtime_ns, size, hash FROM files WHERE path = ?', (path, )
+            ).fetchone()
+            if row is not None and row[0] == stat.st_mtime_ns and row[1] == stat.st_size:
+                file_hash = row[2]
+            else:
+                file_hash = get_file_hash(path)
+                self._files.append((path, stat.st_mtime_ns, stat.st_size, file_hash))
+                self._flush_if_needed()
+        self._hashes[path] = file_hash
+        return file_hash
+
+    def _flush_if_needed(self):
+        if len(self._files) + len(self._results) >= WRITE_BATCH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if not self._files and not self._results:
+            return
+        self._connection.execute('BEGIN IMMEDIATE')
+        try:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO results (key, data) VALUES (?, ?)',
+                self._results)
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO files (path, mtime_ns, size, hash) '
+                'VALUES (?, ?, ?, ?)', self._files)
+        except BaseException:
+            self._connection.execute('ROLLBACK')
+            raise
+        self._connection.execute('COMMIT')
+        self._files = []
+        self._results = []
+
+    def _get_key(self, arguments, filename, file_hash):
+        abs_path = os.path.dirname(os.path.abspath(filename))
+        configs = [
+            [cfg_file, config.readable, [[name, val] for name, val, _ in config.options]]
+            for _, cfg_file, config in cpplint._GetConfigChain(abs_path)]
+        h = hashlib.sha1()
+        h.update(json.dumps([
+            self.fingerprint, arguments, filename, file_hash, configs,
+            cpplint._GetRepositoryRoot(abs_path),
+        ]).encode())
+        return h.hexdigest()
+
+
+def get_file_hash(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def get_module_fingerprint():
+    """Get a hash of the ament_cpplint modules including cpplint."""
+    h = hashlib.sha1()
+    h.update(str(CACHE_FORMAT_VERSION).encode())
+    package_path = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package_path)):
+        if name.endswith('.py'):
+            h.update(name.encode())
+            h.update(get_file_hash(os.path.join(package_path, name)).encode())
+    return h.hexdigest()
@@ -43,13 +43,13 @@ We do a small hack, which is to ignore //'s with "'s after them on the
 same line, but it is far from perfect (in either direction).
 """
 
+import bisect
 import codecs
 import copy
 import getopt
 import math  # for log
 import os
 import re
-import sre_compile
 import string
 import sys
 import unicodedata
@@ -436,8 +436,41 @@ _CPP_HEADERS = frozenset([
     'cwctype',
     ])
 
+class _LazyRegex(object):
+  """A regular expression which is only compiled when it is used first.
+
+  Compiling all module level patterns on import is a noticeable part of the
+  startup time.  After compiling the pattern the methods of the compiled
+  pattern are stored on the instance, so using them doesn't go through
+  __getattr__ anymore.
+  """
+
+  def __init__(self, pattern, flags=0):
+    self._pattern = pattern
+    self._flags = flags
+
+  def __getattr__(self, name):
+    if name.startswith('_'):
+      raise AttributeError(name)
+    compiled = re.compile(self._pattern, self._flags)
+    for attr in ('match', 'search', 'sub', 'subn', 'split', 'findall',
+                 'finditer', 'pattern', 'flags', 'groups', 'groupindex'):
+      setattr(self, attr, getattr(compiled, attr))
+    return getattr(compiled, name)
+
+
+def _CompileLazyRegexes():
+  """Compiles all module level patterns, e.g. before forking processes."""
+  for value in list(globals().values()):
+    if isinstance(value, _LazyRegex):
+      value.pattern
+  for patterns in (_re_pattern_headers_maybe_templates, _re_pattern_templates):
+    for value in patterns:
+      value[0].pattern
+
+
 # Type names
-_TYPES = re.compile(
+_TYPES = _LazyRegex(
     r'^(?:'
     # [dcl.type.simple]
     r'(char(16_t|32_t)?)|wchar_t|'
@@ -455,14 +488,14 @@ _TYPES = re.compile(
 # - Anything not following google file name conventions (containing an
 #   uppercase character, such as Python.h or nsStringAPI.h, for example).
 # - Lua headers.
-_THIRD_PARTY_HEADERS_PATTERN = re.compile(
+_THIRD_PARTY_HEADERS_PATTERN = _LazyRegex(
     r'^(?:[^/]*[A-Z][^/]*\.h|lua\.h|lauxlib\.h|lualib\.h)$')
 
 # Pattern for matching FileInfo.BaseName() against test file name
 _TEST_FILE_SUFFIX = r'(_test|_unittest|_regtest)$'
 
 # Pattern that matches only complete whitespace, possibly across multiple lines.
-_EMPTY_CONDITIONAL_BODY_PATTERN = re.compile(r'^\s*$', re.DOTALL)
+_EMPTY_CONDITIONAL_BODY_PATTERN = _LazyRegex(r'^\s*$', re.DOTALL)
 
 # Assertion macros.  These are defined in base/logging.h and
 # testing/base/public/gunit.h.
@@ -513,7 +546,7 @@ _ALT_TOKEN_REPLACEMENT = {
 #
 # False positives include C-style multi-line comments and multi-line strings
 # but those have always been troublesome for cpplint.
-_ALT_TOKEN_REPLACEMENT_PATTERN = re.compile(
+_ALT_TOKEN_REPLACEMENT_PATTERN = _LazyRegex(
     r'[ =()](' + ('|'.join(_ALT_TOKEN_REPLACEMENT.keys())) + r')(?=[ (]|$)')
 
 
@@ -532,16 +565,16 @@ _END_ASM = 2      # Last line of inline assembly block
 _BLOCK_ASM = 3    # The whole block is an inline assembly block
 
 # Match start of assembly blocks
-_MATCH_ASM = re.compile(r'^\s*(?:asm|_asm|__asm|__asm__)'
+_MATCH_ASM = _LazyRegex(r'^\s*(?:asm|_asm|__asm|__asm__)'
                         r'(?:\s+(volatile|__volatile__))?'
                         r'\s*[{(]')
 
 # Match strings that indicate we're working on a C (not C++) file.
-_SEARCH_C_FILE = re.compile(r'\b(?:LINT_C_FILE|'
+_SEARCH_C_FILE = _LazyRegex(r'\b(?:LINT_C_FILE|'
                             r'vim?:\s*.*(\s*|:)filetype=c(\s*|:|$))')
 
 # Match string that indicates we're working on a Linux Kernel file.
-_SEARCH_KERNEL_FILE = re.compile(r'\b(?:LINT_KERNEL_FILE)')
+_SEARCH_KERNEL_FILE = _LazyRegex(r'\b(?:LINT_KERNEL_FILE)')
 
 _regexp_compile_cache = {}
 
@@ -569,6 +602,14 @@ _hpp_headers = set(['h'])
 # category should be suppressed for every line.
 _global_error_suppressions = {}
 
+# frozenset(function): the checks which are skipped for the current file since
+# all the error categories they can report are filtered out.
+_skipped_checks = frozenset()
+
+# {tuple(str), frozenset(function)}: a map from filters to the checks which
+# are skipped when using them.
+_skipped_checks_by_filters = {}
+
 def ProcessHppHeadersOption(val):
   global _hpp_headers
   try:
@@ -660,9 +701,10 @@ def Match(pattern, s):
   # The regexp compilation caching is inlined in both Match and Search for
   # performance reasons; factoring it out into a separate function turns out
   # to be noticeably expensive.
-  if pattern not in _regexp_compile_cache:
-    _regexp_compile_cache[pattern] = sre_compile.compile(pattern)
-  return _regexp_compile_cache[pattern].match(s)
+  regexp = _regexp_compile_cache.get(pattern)
+  if regexp is None:
+    regexp = _regexp_compile_cache[pattern] = re.compile(pattern)
+  return regexp.match(s)
 
 
 def ReplaceAll(pattern, rep, s):
@@ -678,16 +720,18 @@ def ReplaceAll(pattern, rep, s):
   Returns:
     string with replacements made (or original string if no replacements)
   """
-  if pattern not in _regexp_compile_cache:
-    _regexp_compile_cache[pattern] = sre_compile.compile(pattern)
-  return _regexp_compile_cache[pattern].sub(rep, s)
+  regexp = _regexp_compile_cache.get(pattern)
+  if regexp is None:
+    regexp = _regexp_compile_cache[pattern] = re.compile(pattern)
+  return regexp.sub(rep, s)
 
 
 def Search(pattern, s):
   """Searches the string for the pattern, caching the compiled regexp."""
-  if pattern not in _regexp_compile_cache:
-    _regexp_compile_cache[pattern] = sre_compile.compile(pattern)
-  return _regexp_compile_cache[pattern].search(s)
+  regexp = _regexp_compile_cache.get(pattern)
+  if regexp is None:
+    regexp = _regexp_compile_cache[pattern] = re.compile(pattern)
+  return regexp.search(s)
 
 
 def _IsSourceExtension(s):
@@ -707,6 +751,8 @@ class _IncludeState(object):
   raise an _IncludeError with an appropriate error message.
 
   """
+  __slots__ = ('include_list', '_section', '_last_header')
+
   # self._section will move monotonically through this set. If it ever
   # needs to move backwards, CheckNextIncludeOrder will raise an error.
   _INITIAL_SECTION = 0
@@ -872,6 +918,8 @@ class _CppLintState(object):
     self._filters_backup = self.filters[:]
     self.counting = 'total'  # In what way are we counting errors?
     self.errors_by_category = {}  # string to int dict storing error counts
+    # names of the checks which have been skipped for at least one file
+    self.skipped_checks = set()
 
     # output format:
     # "emacs" - format that emacs can parse (default)
@@ -1023,6 +1071,8 @@ def _RestoreFilters():
 class _FunctionState(object):
   """Tracks current function name and the number of lines in its body."""
 
+  __slots__ = ('in_a_function', 'lines_in_function', 'current_function')
+
   _NORMAL_TRIGGER = 250  # for --v=0, 500 for --v=1, etc.
   _TEST_TRIGGER = 400    # about 50% more than _NORMAL_TRIGGER.
 
@@ -1084,6 +1134,68 @@ class _IncludeError(Exception):
   pass
 
 
+# {str, str}: a map from directories to the root directory of the repository
+# they belong to or None.
+_repository_root_cache = {}
+
+# {str, str}: a map from directories to the closest of the directory and its
+# ancestors containing a version control directory or None.
+_vcs_dir_cache = {}
+
+
+def _HasVcsDir(directory):
+  return (os.path.exists(os.path.join(directory, ".git")) or
+          os.path.exists(os.path.join(directory, ".hg")) or
+          os.path.exists(os.path.join(directory, ".svn")))
+
+
+def _FindClosestVcsDir(directory):
+  """Returns the closest directory containing a .git, .hg or .svn entry.
+
+  The filesystem root is not considered.  The result is cached for the
+  directory and all its ancestors which have been probed.
+  """
+  if directory in _vcs_dir_cache:
+    return _vcs_dir_cache[directory]
+  parent = os.path.dirname(directory)
+  if directory == parent:
+    vcs_dir = None
+  elif _HasVcsDir(directory):
+    vcs_dir = directory
+  else:
+    vcs_dir = _FindClosestVcsDir(parent)
+  _vcs_dir_cache[directory] = vcs_dir
+  return vcs_dir
+
+
+def _GetRepositoryRoot(project_dir):
+  """Returns the root directory of the repository containing a directory.
+
+  Returns None if the directory isn't part of a repository.  The result is
+  cached for each directory.
+  """
+  if project_dir in _repository_root_cache:
+    return _repository_root_cache[project_dir]
+
+  if os.path.exists(os.path.join(project_dir, ".svn")):
+    # If there's a .svn file in the current directory, we recursively look
+    # up the directory tree for the top of the SVN checkout
+    root_dir = project_dir
+    one_up_dir = os.path.dirname(root_dir)
+    while os.path.exists(os.path.join(one_up_dir, ".svn")):
+      root_dir = os.path.dirname(root_dir)
+      one_up_dir = os.path.dirname(one_up_dir)
+  else:
+    # Not SVN <= 1.6? Try to find a git, hg, or svn top level directory by
+    # searching up from the current path.
+    root_dir = _FindClosestVcsDir(project_dir)
+    if root_dir is None and _HasVcsDir(project_dir):
+      root_dir = project_dir
+
+  _repository_root_cache[project_dir] = root_dir
+  return root_dir
+
+
 class FileInfo(object):
   """Provides utility functions for filenames.
 
@@ -1112,33 +1224,8 @@ class FileInfo(object):
 
     if os.path.exists(fullname):
       project_dir = os.path.dirname(fullname)
-
-      if os.path.exists(os.path.join(project_dir, ".svn")):
-        # If there's a .svn file in the current directory, we recursively look
-        # up the directory tree for the top of the SVN checkout
-        root_dir = project_dir
-        one_up_dir = os.path.dirname(root_dir)
-        while os.path.exists(os.path.join(one_up_dir, ".svn")):
-          root_dir = os.path.dirname(root_dir)
-          one_up_dir = os.path.dirname(one_up_dir)
-
-        prefix = os.path.commonprefix([root_dir, project_dir])
-        return fullname[len(prefix) + 1:]
-
-      # Not SVN <= 1.6? Try to find a git, hg, or svn top level directory by
-      # searching up from the current path.
-      root_dir = current_dir = os.path.dirname(fullname)
-      while current_dir != os.path.dirname(current_dir):
-        if (os.path.exists(os.path.join(current_dir, ".git")) or
-            os.path.exists(os.path.join(current_dir, ".hg")) or
-            os.path.exists(os.path.join(current_dir, ".svn"))):
-          root_dir = current_dir
-          break
-        current_dir = os.path.dirname(current_dir)
-
-      if (os.path.exists(os.path.join(root_dir, ".git")) or
-          os.path.exists(os.path.join(root_dir, ".hg")) or
-          os.path.exists(os.path.join(root_dir, ".svn"))):
+      root_dir = _GetRepositoryRoot(project_dir)
+      if root_dir is not None:
         prefix = os.path.commonprefix([root_dir, project_dir])
         return fullname[len(prefix) + 1:]
 
@@ -1188,6 +1275,14 @@ def _ShouldPrintError(category, confidence, linenum):
   if confidence < _cpplint_state.verbose_level:
     return False
 
+  if _IsCategoryFiltered(category):
+    return False
+
+  return True
+
+
+def _IsCategoryFiltered(category):
+  """Returns true if the category is filtered out by the current filters."""
   is_filtered = False
   for one_filter in _Filters():
     if one_filter.startswith('-'):
@@ -1198,10 +1293,7 @@ def _ShouldPrintError(category, confidence, linenum):
         is_filtered = False
     else:
       assert False  # should have been checked for in SetFilter.
-  if is_filtered:
-    return False
-
-  return True
+  return is_filtered
 
 
 def Error(filename, linenum, category, confidence, message):
@@ -1240,8 +1332,15 @@ def Error(filename, linenum, category, confidence, message):
 
 
 # Matches standard C++ escape sequences per 2.13.2.3 of the C++ standard.
-_RE_PATTERN_CLEANSE_LINE_ESCAPES = re.compile(
+_RE_PATTERN_CLEANSE_LINE_ESCAPES = _LazyRegex(
     r'\\([abfnrtv?"\\\']|\d+|x[0-9a-fA-F]+)')
+# Matches single and double quotes.
+_RE_PATTERN_QUOTE = _LazyRegex(r'[\'"]')
+# Matches the digits before a digit separator at the end of a string.
+_RE_PATTERN_DIGIT_SEPARATOR_PREFIX = _LazyRegex(
+    r'\b(?:0[bBxX]?|[1-9])[0-9a-fA-F]*$')
+# Matches a number with digit separators starting with a digit separator.
+_RE_PATTERN_DIGIT_SEPARATOR_LITERAL = _LazyRegex(r"(?:'?[0-9a-zA-Z_])*")
 # Match a single C style comment on the same line.
 _RE_PATTERN_C_COMMENTS = r'/\*(?:[^*]|\*(?!/))*\*/'
 # Matches multi-line C style comments.
@@ -1252,7 +1351,7 @@ _RE_PATTERN_C_COMMENTS = r'/\*(?:[^*]|\*(?!/))*\*/'
 # end of the line. Otherwise, we try to remove spaces from the right side,
 # if this doesn't work we try on left side but only if there's a non-character
 # on the right.
-_RE_PATTERN_CLEANSE_LINE_C_COMMENTS = re.compile(
+_RE_PATTERN_CLEANSE_LINE_C_COMMENTS = _LazyRegex(
     r'(\s*' + _RE_PATTERN_C_COMMENTS + r'\s*$|' +
     _RE_PATTERN_C_COMMENTS + r'\s+|' +
     r'\s+' + _RE_PATTERN_C_COMMENTS + r'(?=\W)|' +
@@ -1412,6 +1511,34 @@ def CleanseComments(line):
   return _RE_PATTERN_CLEANSE_LINE_C_COMMENTS.sub('', line)
 
 
+class _LazyLines(object):
+  """A list of lines which are only computed when they are accessed.
+
+  Each line is derived from the line with the same index in the source list
+  using the transform function and cached afterwards.
+  """
+
+  def __init__(self, source, transform):
+    self._source = source
+    self._transform = transform
+    self._lines = [None] * len(source)
+
+  def __len__(self):
+    return len(self._lines)
+
+  def __iter__(self):
+    for index in xrange(len(self._lines)):
+      yield self[index]
+
+  def __getitem__(self, index):
+    if isinstance(index, slice):
+      return [self[i] for i in xrange(*index.indices(len(self._lines)))]
+    line = self._lines[index]
+    if line is None:
+      line = self._lines[index] = self._transform(self._source[index])
+    return line
+
+
 class CleansedLines(object):
   """Holds 4 copies of all lines with different preprocessing applied to them.
 
@@ -1420,25 +1547,50 @@ class CleansedLines(object):
   3) raw_lines member contains all the lines without processing.
   4) lines_without_raw_strings member is same as raw_lines, but with C++11 raw
      strings removed.
-  All these members are of <type 'list'>, and of the same length.
+  All these members are sequences of the same length.  Only raw_lines and
+  lines_without_raw_strings are of <type 'list'>, the elided and comment free
+  lines are computed when they are accessed for the first time.  If the lines
+  don't contain any raw strings lines_without_raw_strings is the same list as
+  raw_lines.
+
+  The positions matched by CloseExpression and ReverseCloseExpression are
+  remembered in expression_ends and expression_starts.
   """
 
   def __init__(self, lines):
-    self.elided = []
-    self.lines = []
     self.raw_lines = lines
     self.num_lines = len(lines)
-    self.lines_without_raw_strings = CleanseRawStrings(lines)
-    for linenum in range(len(self.lines_without_raw_strings)):
-      self.lines.append(CleanseComments(
-          self.lines_without_raw_strings[linenum]))
-      elided = self._CollapseStrings(self.lines_without_raw_strings[linenum])
-      self.elided.append(CleanseComments(elided))
+    if any('R"' in line for line in lines):
+      self.lines_without_raw_strings = CleanseRawStrings(lines)
+    else:
+      self.lines_without_raw_strings = lines
+    self.lines = _LazyLines(self.lines_without_raw_strings, CleanseComments)
+    self.elided = _LazyLines(
+        self.lines_without_raw_strings,
+        lambda line: CleanseComments(self._CollapseStrings(line)))
+    # {(int, int): (int, int)}: maps the (linenum, pos) of opening and closing
+    # brackets to the result of _FindEndOfExpression and
+    # _FindStartOfExpression respectively.
+    self.expression_ends = {}
+    self.expression_starts = {}
+    # {str: [int]}: the results of FindElidedLines.
+    self._elided_lines_containing = {}
 
   def NumLines(self):
     """Returns the number of lines represented."""
     return self.num_lines
 
+  def FindElidedLines(self, text):
+    """Returns the sorted numbers of the elided lines containing a text.
+
+    The lines are only searched once per text.
+    """
+    linenums = self._elided_lines_containing.get(text)
+    if linenums is None:
+      linenums = [i for i, line in enumerate(self.elided) if text in line]
+      self._elided_lines_containing[text] = linenums
+    return linenums
+
   @staticmethod
   def _CollapseStrings(elided):
     """Collapses strings and chars on a line to simple "" or '' blocks.
@@ -1460,27 +1612,30 @@ class CleansedLines(object):
     elided = _RE_PATTERN_CLEANSE_LINE_ESCAPES.sub('', elided)
 
     # Replace quoted strings and digit separators.  Both single quotes
-    # and double quotes are processed in the same loop, otherwise
-    # nested quotes wouldn't work.
-    collapsed = ''
+    # and double quotes are processed in the same pass, otherwise
+    # nested quotes wouldn't work.  The line is scanned once from left to
+    # right without copying the remainder of the line for every quote.
+    collapsed = []
+    pos = 0
     while True:
-      # Find the first quote character
-      match = Match(r'^([^\'"]*)([\'"])(.*)$', elided)
+      # Find the next quote character
+      match = _RE_PATTERN_QUOTE.search(elided, pos)
       if not match:
-        collapsed += elided
+        collapsed.append(elided[pos:])
         break
-      head, quote, tail = match.groups()
+      quote_pos = match.start()
+      head = elided[pos:quote_pos]
 
-      if quote == '"':
+      if match.group(0) == '"':
         # Collapse double quoted strings
-        second_quote = tail.find('"')
+        second_quote = elided.find('"', quote_pos + 1)
         if second_quote >= 0:
-          collapsed += head + '""'
-          elided = tail[second_quote + 1:]
+          collapsed.append(head + '""')
+          pos = second_quote + 1
         else:
           # Unmatched double quote, don't bother processing the rest
           # of the line since this is probably a multiline string.
-          collapsed += elided
+          collapsed.append(elided[pos:])
           break
       else:
         # Found single quote, check nearby text to eliminate digit separators.
@@ -1490,21 +1645,22 @@ class CleansedLines(object):
         # correctly as long as there are digits on both sides of the
         # separator.  So we are fine as long as we don't see something
         # like "0.'3" (gcc 4.9.0 will not allow this literal).
-        if Search(r'\b(?:0[bBxX]?|[1-9])[0-9a-fA-F]*$', head):
-          match_literal = Match(r'^((?:\'?[0-9a-zA-Z_])*)(.*)$', "'" + tail)
-          collapsed += head + match_literal.group(1).replace("'", '')
-          elided = match_literal.group(2)
+        if _RE_PATTERN_DIGIT_SEPARATOR_PREFIX.search(head):
+          match_literal = _RE_PATTERN_DIGIT_SEPARATOR_LITERAL.match(
+              elided, quote_pos)
+          collapsed.append(head + match_literal.group(0).replace("'", ''))
+          pos = match_literal.end()
         else:
-          second_quote = tail.find('\'')
+          second_quote = elided.find('\'', quote_pos + 1)
           if second_quote >= 0:
-            collapsed += head + "''"
-            elided = tail[second_quote + 1:]
+            collapsed.append(head + "''")
+            pos = second_quote + 1
           else:
             # Unmatched single quote
-            collapsed += elided
+            collapsed.append(elided[pos:])
             break
 
-    return collapsed
+    return ''.join(collapsed)
 
 
 def FindEndOfExpressionInLine(line, startpos, stack):
@@ -1585,16 +1741,113 @@ def FindEndOfExpressionInLine(line, startpos, stack):
   return (-1, stack)
 
 
+def _FindEndOfExpression(clean_lines, linenum, pos):
+  """Finds the end of the expression starting at linenum/pos.
+
+  This gives the same result as calling FindEndOfExpressionInLine for
+  consecutive lines, but the stack also holds the position of each opening
+  bracket.  The end of every nested expression found along the way is
+  remembered in clean_lines.expression_ends, and nested expressions whose end
+  is already known are skipped.  This keeps matching the braces of deeply
+  nested code linear instead of scanning the same lines for every level.
+
+  Args:
+    clean_lines: A CleansedLines instance containing the file.
+    linenum: The number of the line to check.
+    pos: A position on the line.
+
+  Returns:
+    A tuple (linenum, pos) pointer *past* the closing brace, or
+    (linenum, -1) with the last line scanned if we never find a close.
+  """
+  ends = clean_lines.expression_ends
+  last_linenum = clean_lines.NumLines() - 1
+  # Stack of (char, (linenum, pos)) tuples.
+  stack = []
+
+  def Unclosed():
+    # The expressions on the stack would stop at the same position.
+    for _, start in stack:
+      ends[start] = (linenum, -1)
+    return (linenum, -1)
+
+  line = clean_lines.elided[linenum]
+  i = pos
+  while True:
+    if i >= len(line):
+      if not stack or linenum >= last_linenum:
+        break
+      linenum += 1
+      line = clean_lines.elided[linenum]
+      i = 0
+      continue
+
+    char = line[i]
+    push = False
+    if char in '([{':
+      push = True
+    elif char == '<':
+      if i > 0 and line[i - 1] == '<':
+        # Left shift operator
+        if stack and stack[-1][0] == '<':
+          ends[stack.pop()[1]] = (linenum, -1)
+          if not stack:
+            return (linenum, -1)
+      elif not (i > 0 and Search(r'\boperator\s*$', line[0:i])):
+        # Tentative start of template argument list
+        push = True
+    elif char in ')]}':
+      while stack and stack[-1][0] == '<':
+        ends[stack.pop()[1]] = (linenum, -1)
+      if not stack:
+        return (linenum, -1)
+      if stack[-1][0] + char in ('()', '[]', '{}'):
+        ends[stack.pop()[1]] = (linenum, i + 1)
+        if not stack:
+          return (linenum, i + 1)
+      else:
+        # Mismatched parentheses
+        return Unclosed()
+    elif char == '>':
+      # Ignore "->" and operator functions
+      if not (i > 0 and
+              (line[i - 1] == '-' or
+               Search(r'\boperator\s*$', line[0:i - 1]))):
+        if stack and stack[-1][0] == '<':
+          ends[stack.pop()[1]] = (linenum, i + 1)
+          if not stack:
+            return (linenum, i + 1)
+    elif char == ';':
+      while stack and stack[-1][0] == '<':
+        ends[stack.pop()[1]] = (linenum, -1)
+      if not stack:
+        return (linenum, -1)
+
+    if push:
+      end = ends.get((linenum, i))
+      if end is not None and end[1] >= 0:
+        if not stack:
+          return end
+        # Skip the nested expression.
+        if end[0] != linenum:
+          line = clean_lines.elided[end[0]]
+        linenum, i = end
+        continue
+      stack.append((char, (linenum, i)))
+    i += 1
+
+  # Did not find end of expression before end of file
+  return Unclosed()
+
+
 def CloseExpression(clean_lines, linenum, pos):
   """If input points to ( or { or [ or <, finds the position that closes it.
 
   If lines[linenum][pos] points to a '(' or '{' or '[' or '<', finds the
   linenum/pos that correspond to the closing of the expression.
 
-  TODO(unknown): cpplint spends a fair bit of time matching parentheses.
-  Ideally we would want to index all opening and closing parentheses once
-  and have CloseExpression be just a simple lookup, but due to preprocessor
-  tricks, this is not so easy.
+  The results are remembered for the file, including those of the nested
+  expressions, so that matching the same parentheses again is just a lookup.
 
   Args:
     clean_lines: A CleansedLines instance containing the file.
@@ -1612,21 +1865,15 @@ def CloseExpression(clean_lines, linenum, pos):
   if (line[pos] not in '({[<') or Match(r'<[<=]', line[pos:]):
     return (line, clean_lines.NumLines(), -1)
 
-  # Check first line
-  (end_pos, stack) = FindEndOfExpressionInLine(line, pos, [])
+  end = clean_lines.expression_ends.get((linenum, pos))
+  if end is None:
+    end = _FindEndOfExpression(clean_lines, linenum, pos)
+  (end_linenum, end_pos) = end
   if end_pos > -1:
-    return (line, linenum, end_pos)
-
-  # Continue scanning forward
-  while stack and linenum < clean_lines.NumLines() - 1:
-    linenum += 1
-    line = clean_lines.elided[linenum]
-    (end_pos, stack) = FindEndOfExpressionInLine(line, 0, stack)
-    if end_pos > -1:
-      return (line, linenum, end_pos)
+    return (clean_lines.elided[end_linenum], end_linenum, end_pos)
 
   # Did not find end of expression before end of file, give up
-  return (line, clean_lines.NumLines(), -1)
+  return (clean_lines.elided[end_linenum], clean_lines.NumLines(), -1)
 
 
 def FindStartOfExpressionInLine(line, endpos, stack):
@@ -1706,6 +1953,99 @@ def FindStartOfExpressionInLine(line, endpos, stack):
   return (-1, stack)
 
 
+def _FindStartOfExpression(clean_lines, linenum, pos):
+  """Finds the start of the expression ending at linenum/pos.
+
+  This is the reverse of _FindEndOfExpression, giving the same result as
+  calling FindStartOfExpressionInLine for consecutive lines.  The starts
+  found along the way are remembered in clean_lines.expression_starts.
+
+  Args:
+    clean_lines: A CleansedLines instance containing the file.
+    linenum: The number of the line to check.
+    pos: A position on the line.
+
+  Returns:
+    A tuple (linenum, pos) pointer *at* the opening brace, or (linenum, -1)
+    with the last line scanned if we never find the opening brace.
+  """
+  starts = clean_lines.expression_starts
+  # Stack of (char, (linenum, pos)) tuples.
+  stack = []
+
+  def Unopened():
+    # The expressions on the stack would stop at the same position.
+    for _, end in stack:
+      starts[end] = (linenum, -1)
+    return (linenum, -1)
+
+  line = clean_lines.elided[linenum]
+  i = pos
+  while True:
+    if i < 0:
+      if not stack or linenum <= 0:
+        break
+      linenum -= 1
+      line = clean_lines.elided[linenum]
+      i = len(line) - 1
+      continue
+
+    char = line[i]
+    push = False
+    if char in ')]}':
+      push = True
+    elif char == '>':
+      # Ignore it if it's a "->" or ">=" or "operator>"
+      if (i > 0 and
+          (line[i - 1] == '-' or
+           Match(r'\s>=\s', line[i - 1:]) or
+           Search(r'\boperator\s*$', line[0:i]))):
+        i -= 1
+      else:
+        push = True
+    elif char == '<':
+      if i > 0 and line[i - 1] == '<':
+        # Left shift operator
+        i -= 1
+      elif stack and stack[-1][0] == '>':
+        starts[stack.pop()[1]] = (linenum, i)
+        if not stack:
+          return (linenum, i)
+    elif char in '([{':
+      while stack and stack[-1][0] == '>':
+        starts[stack.pop()[1]] = (linenum, -1)
+      if not stack:
+        return (linenum, -1)
+      if char + stack[-1][0] in ('()', '[]', '{}'):
+        starts[stack.pop()[1]] = (linenum, i)
+        if not stack:
+          return (linenum, i)
+      else:
+        # Mismatched parentheses
+        return Unopened()
+    elif char == ';':
+      while stack and stack[-1][0] == '>':
+        starts[stack.pop()[1]] = (linenum, -1)
+      if not stack:
+        return (linenum, -1)
+
+    if push:
+      start = starts.get((linenum, i))
+      if start is not None and start[1] >= 0:
+        if not stack:
+          return start
+        # Skip the nested expression.
+        if start[0] != linenum:
+          line = clean_lines.elided[start[0]]
+        linenum, i = start
+      else:
+        stack.append((char, (linenum, i)))
+    i -= 1
+
+  # Did not find start of expression before beginning of file
+  return Unopened()
+
+
 def ReverseCloseExpression(clean_lines, linenum, pos):
   """If input points to ) or } or ] or >, finds the position that opens it.
 
@@ -1727,21 +2067,15 @@ def ReverseCloseExpression(clean_lines, linenum, pos):
   if line[pos] not in ')}]>':
     return (line, 0, -1)
 
-  # Check last line
-  (start_pos, stack) = FindStartOfExpressionInLine(line, pos, [])
+  start = clean_lines.expression_starts.get((linenum, pos))
+  if start is None:
+    start = _FindStartOfExpression(clean_lines, linenum, pos)
+  (start_linenum, start_pos) = start
   if start_pos > -1:
-    return (line, linenum, start_pos)
-
-  # Continue scanning backward
-  while stack and linenum > 0:
-    linenum -= 1
-    line = clean_lines.elided[linenum]
-    (start_pos, stack) = FindStartOfExpressionInLine(line, len(line) - 1, stack)
-    if start_pos > -1:
-      return (line, linenum, start_pos)
+    return (clean_lines.elided[start_linenum], start_linenum, start_pos)
 
   # Did not find start of expression before beginning of file, give up
-  return (line, 0, -1)
+  return (clean_lines.elided[start_linenum], 0, -1)
 
 
 def CheckForCopyright(filename, lines, error):
@@ -2084,7 +2418,7 @@ def CheckVlogArguments(filename, clean_lines, linenum, error):
 
 # Matches invalid increment: *count++, which moves pointer instead of
 # incrementing a value.
-_RE_PATTERN_INVALID_INCREMENT = re.compile(
+_RE_PATTERN_INVALID_INCREMENT = _LazyRegex(
     r'^\s*\*\w+(\+\+|--);')
 
 
@@ -2127,12 +2461,20 @@ def IsForwardClassDeclaration(clean_lines, linenum):
 class _BlockInfo(object):
   """Stores information about a generic block of code."""
 
+  # The blocks use slots since a copy of the nesting stack is kept for every
+  # preprocessor conditional.
+  __slots__ = ('starting_linenum', 'seen_open_brace', 'open_parentheses',
+               'inline_asm', 'check_namespace_indentation', 'innermost_class')
+
   def __init__(self, linenum, seen_open_brace):
     self.starting_linenum = linenum
     self.seen_open_brace = seen_open_brace
     self.open_parentheses = 0
     self.inline_asm = _NO_ASM
     self.check_namespace_indentation = False
+    # The innermost class of the nesting stack including this block, set by
+    # NestingState when the block is pushed.
+    self.innermost_class = None
 
   def CheckBegin(self, filename, clean_lines, linenum, error):
     """Run checks that applies to text up to the opening brace.
@@ -2177,6 +2519,8 @@ class _BlockInfo(object):
 class _ExternCInfo(_BlockInfo):
   """Stores information about an 'extern "C"' block."""
 
+  __slots__ = ()
+
   def __init__(self, linenum):
     _BlockInfo.__init__(self, linenum, True)
 
@@ -2184,6 +2528,9 @@ class _ExternCInfo(_BlockInfo):
 class _ClassInfo(_BlockInfo):
   """Stores information about a class."""
 
+  __slots__ = ('name', 'is_derived', 'access', 'is_struct', 'class_indent',
+               'last_line')
+
   def __init__(self, name, class_or_struct, clean_lines, linenum):
     _BlockInfo.__init__(self, linenum, False)
     self.name = name
@@ -2221,22 +2568,25 @@ class _ClassInfo(_BlockInfo):
 
   def CheckEnd(self, filename, clean_lines, linenum, error):
     # If there is a DISALLOW macro, it should appear near the end of
-    # the class.
-    seen_last_thing_in_class = False
-    for i in xrange(linenum - 1, self.starting_linenum, -1):
+    # the class.  Only the lines containing a DISALLOW macro are searched
+    # rather than the whole class, which would be quadratic for nested
+    # classes.
+    macro_linenums = clean_lines.FindElidedLines('DISALLOW_')
+    first = bisect.bisect_right(macro_linenums, self.starting_linenum)
+    last = bisect.bisect_left(macro_linenums, linenum)
+    for i in reversed(macro_linenums[first:last]):
       match = Search(
           r'\b(DISALLOW_COPY_AND_ASSIGN|DISALLOW_IMPLICIT_CONSTRUCTORS)\(' +
           self.name + r'\)',
           clean_lines.elided[i])
       if match:
-        if seen_last_thing_in_class:
-          error(filename, i, 'readability/constructors', 3,
-                match.group(1) + ' should be the last thing in the class')
+        for j in xrange(linenum - 1, i, -1):
+          if not Match(r'^\s*$', clean_lines.elided[j]):
+            error(filename, i, 'readability/constructors', 3,
+                  match.group(1) + ' should be the last thing in the class')
+            break
         break
 
-      if not Match(r'^\s*$', clean_lines.elided[i]):
-        seen_last_thing_in_class = True
-
     # Check that closing brace is aligned with beginning of the class.
     # Only do this if the closing brace is indented by only whitespaces.
     # This means we will not check single-line class definitions.
@@ -2253,6 +2603,8 @@ class _ClassInfo(_BlockInfo):
 class _NamespaceInfo(_BlockInfo):
   """Stores information about a namespace."""
 
+  __slots__ = ('name',)
+
   def __init__(self, name, linenum):
     _BlockInfo.__init__(self, linenum, False)
     self.name = name or ''
@@ -2314,6 +2666,8 @@ class _NamespaceInfo(_BlockInfo):
 class _PreprocessorInfo(object):
   """Stores checkpoints of nesting stacks when #if/#else is seen."""
 
+  __slots__ = ('stack_before_if', 'stack_before_else', 'seen_else')
+
   def __init__(self, stack_before_if):
     # The entire nesting stack before #if
     self.stack_before_if = stack_before_if
@@ -2561,7 +2915,7 @@ class NestingState(object):
         break
 
       new_namespace = _NamespaceInfo(namespace_decl_match.group(1), linenum)
-      self.stack.append(new_namespace)
+      self._PushBlock(new_namespace)
 
       line = namespace_decl_match.group(2)
       if line.find('{') != -1:
@@ -2590,7 +2944,7 @@ class NestingState(object):
       # template argument list.
       end_declaration = len(class_decl_match.group(1))
       if not self.InTemplateArgumentList(clean_lines, linenum, end_declaration):
-        self.stack.append(_ClassInfo(
+        self._PushBlock(_ClassInfo(
             class_decl_match.group(3), class_decl_match.group(2),
             clean_lines, linenum))
         line = class_decl_match.group(4)
@@ -2641,9 +2995,9 @@ class NestingState(object):
         if not self.SeenOpenBrace():
           self.stack[-1].seen_open_brace = True
         elif Match(r'^extern\s*"[^"]*"\s*\{', line):
-          self.stack.append(_ExternCInfo(linenum))
+          self._PushBlock(_ExternCInfo(linenum))
         else:
-          self.stack.append(_BlockInfo(linenum, True))
+          self._PushBlock(_BlockInfo(linenum, True))
           if _MATCH_ASM.match(line):
             self.stack[-1].inline_asm = _BLOCK_ASM
 
@@ -2665,16 +3019,30 @@ class NestingState(object):
           self.stack.pop()
       line = matched.group(2)
 
+  def _PushBlock(self, block):
+    """Push a block onto the stack.
+
+    The block remembers the innermost class at this point, which doesn't
+    change while the block is on the stack since the stack is only pushed and
+    popped.  This keeps InnermostClass constant time for deeply nested code.
+
+    Args:
+      block: The _BlockInfo to push.
+    """
+    if isinstance(block, _ClassInfo):
+      block.innermost_class = block
+    elif self.stack:
+      block.innermost_class = self.stack[-1].innermost_class
+    self.stack.append(block)
+
   def InnermostClass(self):
     """Get class info on the top of the stack.
 
     Returns:
       A _ClassInfo object if we are inside a class, or None otherwise.
     """
-    for i in range(len(self.stack), 0, -1):
-      classinfo = self.stack[i - 1]
-      if isinstance(classinfo, _ClassInfo):
-        return classinfo
+    if self.stack:
+      return self.stack[-1].innermost_class
     return None
 
   def CheckCompletedBlocks(self, filename, error):
@@ -3032,7 +3400,7 @@ def CheckForFunctionLengths(filename, clean_lines, linenum,
     function_state.Count()  # Count non-blank/non-comment lines.
 
 
-_RE_PATTERN_TODO = re.compile(r'^//(\s*)TODO(\(.+?\))?:?(\s|$)?')
+_RE_PATTERN_TODO = _LazyRegex(r'^//(\s*)TODO(\(.+?\))?:?(\s|$)?')
 
 
 def CheckComment(line, filename, linenum, next_line_start, error):
@@ -4352,30 +4720,42 @@ def CheckStyle(filename, clean_lines, linenum, file_extension, nesting_state,
           'More than one command on the same line')
 
   # Some more style checks
-  CheckBraces(filename, clean_lines, linenum, error)
-  CheckTrailingSemicolon(filename, clean_lines, linenum, error)
-  CheckEmptyBlockBody(filename, clean_lines, linenum, error)
-  CheckAccess(filename, clean_lines, linenum, nesting_state, error)
-  CheckSpacing(filename, clean_lines, linenum, nesting_state, error)
-  CheckOperatorSpacing(filename, clean_lines, linenum, error)
-  CheckParenthesisSpacing(filename, clean_lines, linenum, error)
-  CheckCommaSpacing(filename, clean_lines, linenum, error)
-  CheckBracesSpacing(filename, clean_lines, linenum, nesting_state, error)
-  CheckSpacingForFunctionCall(filename, clean_lines, linenum, error)
-  CheckCheck(filename, clean_lines, linenum, error)
-  CheckAltTokens(filename, clean_lines, linenum, error)
+  if CheckBraces not in _skipped_checks:
+    CheckBraces(filename, clean_lines, linenum, error)
+  if CheckTrailingSemicolon not in _skipped_checks:
+    CheckTrailingSemicolon(filename, clean_lines, linenum, error)
+  if CheckEmptyBlockBody not in _skipped_checks:
+    CheckEmptyBlockBody(filename, clean_lines, linenum, error)
+  if CheckAccess not in _skipped_checks:
+    CheckAccess(filename, clean_lines, linenum, nesting_state, error)
+  if CheckSpacing not in _skipped_checks:
+    CheckSpacing(filename, clean_lines, linenum, nesting_state, error)
+  if CheckOperatorSpacing not in _skipped_checks:
+    CheckOperatorSpacing(filename, clean_lines, linenum, error)
+  if CheckParenthesisSpacing not in _skipped_checks:
+    CheckParenthesisSpacing(filename, clean_lines, linenum, error)
+  if CheckCommaSpacing not in _skipped_checks:
+    CheckCommaSpacing(filename, clean_lines, linenum, error)
+  if CheckBracesSpacing not in _skipped_checks:
+    CheckBracesSpacing(filename, clean_lines, linenum, nesting_state, error)
+  if CheckSpacingForFunctionCall not in _skipped_checks:
+    CheckSpacingForFunctionCall(filename, clean_lines, linenum, error)
+  if CheckCheck not in _skipped_checks:
+    CheckCheck(filename, clean_lines, linenum, error)
+  if CheckAltTokens not in _skipped_checks:
+    CheckAltTokens(filename, clean_lines, linenum, error)
   classinfo = nesting_state.InnermostClass()
   if classinfo:
     CheckSectionSpacing(filename, clean_lines, classinfo, linenum, error)
 
 
-_RE_PATTERN_INCLUDE = re.compile(r'^\s*#\s*include\s*([<"])([^>"]*)[>"].*$')
+_RE_PATTERN_INCLUDE = _LazyRegex(r'^\s*#\s*include\s*([<"])([^>"]*)[>"].*$')
 # Matches the first component of a filename delimited by -s and _s. That is:
 #  _RE_FIRST_COMPONENT.match('foo').group(0) == 'foo'
 #  _RE_FIRST_COMPONENT.match('foo.cc').group(0) == 'foo'
 #  _RE_FIRST_COMPONENT.match('foo-bar_baz.cc').group(0) == 'foo'
 #  _RE_FIRST_COMPONENT.match('foo_bar-baz.cc').group(0) == 'foo'
-_RE_FIRST_COMPONENT = re.compile(r'^[^-_.]+')
+_RE_FIRST_COMPONENT = _LazyRegex(r'^[^-_.]+')
 
 
 def _DropCommonSuffixes(filename):
@@ -4614,7 +4994,7 @@ _RE_PATTERN_TYPE = (
     r'\s*<(?:<(?:<[^<>]*>|[^<>])*>|[^<>])*>|'
     r'::)+')
 # A call-by-reference parameter ends with '& identifier'.
-_RE_PATTERN_REF_PARAM = re.compile(
+_RE_PATTERN_REF_PARAM = _LazyRegex(
     r'(' + _RE_PATTERN_TYPE + r'(?:\s*(?:\bconst\b|[*]))*\s*'
     r'&\s*' + _RE_PATTERN_IDENT + r')\s*(?:=[^,()]+)?[,)]')
 # A call-by-const-reference parameter either ends with 'const& identifier'
@@ -4665,9 +5045,12 @@ def CheckLanguage(filename, clean_lines, linenum, file_extension,
   fullname = os.path.abspath(filename).replace('\\', '/')
 
   # Perform other checks now that we are sure that this is not an include line
-  CheckCasts(filename, clean_lines, linenum, error)
-  CheckGlobalStatic(filename, clean_lines, linenum, error)
-  CheckPrintf(filename, clean_lines, linenum, error)
+  if CheckCasts not in _skipped_checks:
+    CheckCasts(filename, clean_lines, linenum, error)
+  if CheckGlobalStatic not in _skipped_checks:
+    CheckGlobalStatic(filename, clean_lines, linenum, error)
+  if CheckPrintf not in _skipped_checks:
+    CheckPrintf(filename, clean_lines, linenum, error)
 
   if IsHeaderExtension(file_extension):
     # TODO(unknown): check that 1-arg constructors are explicit.
@@ -5106,7 +5489,7 @@ def CheckForNonConstReference(filename, clean_lines, linenum,
         return
 
   decls = ReplaceAll(r'{[^}]*}', ' ', line)  # exclude function body
-  for parameter in re.findall(_RE_PATTERN_REF_PARAM, decls):
+  for parameter in _RE_PATTERN_REF_PARAM.findall(decls):
     if (not Match(_RE_PATTERN_CONST_REF_PARAM, parameter) and
         not Match(_RE_PATTERN_REF_STREAM_PARAM, parameter)):
       error(filename, linenum, 'runtime/references', 2,
@@ -5361,7 +5744,7 @@ _HEADERS_MAYBE_TEMPLATES = (
     ('<utility>', ('forward', 'make_pair', 'move', 'swap')),
     )
 
-_RE_PATTERN_STRING = re.compile(r'\bstring\b')
+_RE_PATTERN_STRING = _LazyRegex(r'\bstring\b')
 
 _re_pattern_headers_maybe_templates = []
 for _header, _templates in _HEADERS_MAYBE_TEMPLATES:
@@ -5369,7 +5752,7 @@ for _header, _templates in _HEADERS_MAYBE_TEMPLATES:
     # Match max<type>(..., ...), max(..., ...), but not foo->max, foo.max or
     # type::max().
     _re_pattern_headers_maybe_templates.append(
-        (re.compile(r'[^>.]\b' + _template + r'(<.*?>)?\([^\)]'),
+        (_LazyRegex(r'[^>.]\b' + _template + r'(<.*?>)?\([^\)]'),
             _template,
             _header))
 
@@ -5378,7 +5761,7 @@ _re_pattern_templates = []
 for _header, _templates in _HEADERS_CONTAINING_TEMPLATES:
   for _template in _templates:
     _re_pattern_templates.append(
-        (re.compile(r'(\<|\b)' + _template + r'\s*\<'),
+        (_LazyRegex(r'(\<|\b)' + _template + r'\s*\<'),
          _template + '<>',
          _header))
 
@@ -5438,6 +5821,50 @@ def FilesBelongToSameModule(filename_cc, filename_h):
   return files_belong_to_same_module, common_path
 
 
+# {str, (int, int, list)}: a map from header paths to their modification
+# time, size and the list of (include, linenum) tuples found in them.
+_include_list_cache = {}
+
+
+def _ReadIncludeList(filename, io):
+  """Returns the list of (include, linenum) tuples of a file or None."""
+  try:
+    headerfile = io.open(filename, 'r', 'utf8', 'replace')
+  except IOError:
+    return None
+  includes = []
+  linenum = 0
+  for line in headerfile:
+    linenum += 1
+    clean_line = CleanseComments(line)
+    match = _RE_PATTERN_INCLUDE.search(clean_line)
+    if match:
+      includes.append((match.group(2), linenum))
+  return includes
+
+
+def _GetIncludeList(filename, io=codecs):
+  """Returns the list of (include, linenum) tuples of a file or None.
+
+  The includes of each file are only read once per process as long as its
+  modification time and size don't change.
+  """
+  if io is not codecs:
+    return _ReadIncludeList(filename, io)
+  try:
+    stat = os.stat(filename)
+  except OSError:
+    return None
+  cached = _include_list_cache.get(filename)
+  if (cached is not None and cached[0] == stat.st_mtime and
+      cached[1] == stat.st_size):
+    return cached[2]
+  includes = _ReadIncludeList(filename, io)
+  if includes is not None:
+    _include_list_cache[filename] = (stat.st_mtime, stat.st_size, includes)
+  return includes
+
+
 def UpdateIncludeState(filename, include_dict, io=codecs):
   """Fill up the include_dict with new includes found from the file.
 
@@ -5449,19 +5876,11 @@ def UpdateIncludeState(filename, include_dict, io=codecs):
   Returns:
     True if a header was successfully added. False otherwise.
   """
-  headerfile = None
-  try:
-    headerfile = io.open(filename, 'r', 'utf8', 'replace')
-  except IOError:
+  includes = _GetIncludeList(filename, io)
+  if includes is None:
     return False
-  linenum = 0
-  for line in headerfile:
-    linenum += 1
-    clean_line = CleanseComments(line)
-    match = _RE_PATTERN_INCLUDE.search(clean_line)
-    if match:
-      include = match.group(2)
-      include_dict.setdefault(include, linenum)
+  for include, linenum in includes:
+    include_dict.setdefault(include, linenum)
   return True
 
 
@@ -5564,7 +5983,7 @@ def CheckForIncludeWhatYouUse(filename, clean_lines, include_state, error,
             'Add #include ' + required_header_unstripped + ' for ' + template)
 
 
-_RE_PATTERN_EXPLICIT_MAKEPAIR = re.compile(r'\bmake_pair\s*<')
+_RE_PATTERN_EXPLICIT_MAKEPAIR = _LazyRegex(r'\bmake_pair\s*<')
 
 
 def CheckMakePairUsesDeduction(filename, clean_lines, linenum, error):
@@ -5769,25 +6188,41 @@ def ProcessLine(filename, file_extension, clean_lines, line,
                            arguments: filename, clean_lines, line, error
   """
   raw_lines = clean_lines.raw_lines
+  skipped = _skipped_checks
   ParseNolintSuppressions(filename, raw_lines[line], line, error)
   nesting_state.Update(filename, clean_lines, line, error)
-  CheckForNamespaceIndentation(filename, nesting_state, clean_lines, line,
-                               error)
+  if CheckForNamespaceIndentation not in skipped:
+    CheckForNamespaceIndentation(filename, nesting_state, clean_lines, line,
+                                 error)
   if nesting_state.InAsmBlock(): return
-  CheckForFunctionLengths(filename, clean_lines, line, function_state, error)
-  CheckForMultilineCommentsAndStrings(filename, clean_lines, line, error)
-  CheckStyle(filename, clean_lines, line, file_extension, nesting_state, error)
-  CheckLanguage(filename, clean_lines, line, file_extension, include_state,
-                nesting_state, error)
-  CheckForNonConstReference(filename, clean_lines, line, nesting_state, error)
-  CheckForNonStandardConstructs(filename, clean_lines, line,
-                                nesting_state, error)
-  CheckVlogArguments(filename, clean_lines, line, error)
-  CheckPosixThreading(filename, clean_lines, line, error)
-  CheckInvalidIncrement(filename, clean_lines, line, error)
-  CheckMakePairUsesDeduction(filename, clean_lines, line, error)
-  CheckRedundantVirtual(filename, clean_lines, line, error)
-  CheckRedundantOverrideOrFinal(filename, clean_lines, line, error)
+  if CheckForFunctionLengths not in skipped:
+    CheckForFunctionLengths(filename, clean_lines, line, function_state, error)
+  if CheckForMultilineCommentsAndStrings not in skipped:
+    CheckForMultilineCommentsAndStrings(filename, clean_lines, line, error)
+  if CheckStyle not in skipped:
+    CheckStyle(filename, clean_lines, line, file_extension, nesting_state,
+               error)
+  if CheckLanguage not in skipped:
+    CheckLanguage(filename, clean_lines, line, file_extension, include_state,
+                  nesting_state, error)
+  if CheckForNonConstReference not in skipped:
+    CheckForNonConstReference(filename, clean_lines, line, nesting_state,
+                              error)
+  if CheckForNonStandardConstructs not in skipped:
+    CheckForNonStandardConstructs(filename, clean_lines, line,
+                                  nesting_state, error)
+  if CheckVlogArguments not in skipped:
+    CheckVlogArguments(filename, clean_lines, line, error)
+  if CheckPosixThreading not in skipped:
+    CheckPosixThreading(filename, clean_lines, line, error)
+  if CheckInvalidIncrement not in skipped:
+    CheckInvalidIncrement(filename, clean_lines, line, error)
+  if CheckMakePairUsesDeduction not in skipped:
+    CheckMakePairUsesDeduction(filename, clean_lines, line, error)
+  if CheckRedundantVirtual not in skipped:
+    CheckRedundantVirtual(filename, clean_lines, line, error)
+  if CheckRedundantOverrideOrFinal not in skipped:
+    CheckRedundantOverrideOrFinal(filename, clean_lines, line, error)
   for check_fn in extra_check_functions:
     check_fn(filename, clean_lines, line, error)
 
@@ -5862,6 +6297,93 @@ def FlagCxx14Features(filename, clean_lines, linenum, error):
           ('<%s> is an unapproved C++14 header.') % include.group(1))
 
 
+# Maps the checks which can be skipped to the error categories they can
+# report.  The categories include the ones reported by the checks called by
+# them.  A check which maintains state used by other checks lists the
+# categories of those checks as well.  NestingState.Update and
+# ParseNolintSuppressions are never skipped since most checks depend on them.
+_CHECK_CATEGORIES = {
+    CheckForNamespaceIndentation: ('runtime/indentation_namespace',),
+    CheckForFunctionLengths: ('readability/fn_size',),
+    CheckForMultilineCommentsAndStrings: (
+        'readability/multiline_comment', 'readability/multiline_string'),
+    CheckStyle: (
+        'readability/alt_tokens', 'readability/braces', 'readability/check',
+        'readability/constructors', 'readability/nolint', 'readability/todo',
+        'whitespace/blank_line', 'whitespace/braces', 'whitespace/comma',
+        'whitespace/comments', 'whitespace/empty_conditional_body',
+        'whitespace/empty_if_body', 'whitespace/empty_loop_body',
+        'whitespace/end_of_line', 'whitespace/forcolon', 'whitespace/indent',
+        'whitespace/line_length', 'whitespace/newline',
+        'whitespace/operators', 'whitespace/parens', 'whitespace/semicolon',
+        'whitespace/tab', 'whitespace/todo'),
+    CheckBraces: (
+        'readability/braces', 'whitespace/braces', 'whitespace/newline'),
+    CheckTrailingSemicolon: ('readability/braces', 'readability/nolint'),
+    CheckEmptyBlockBody: (
+        'whitespace/empty_conditional_body', 'whitespace/empty_if_body',
+        'whitespace/empty_loop_body'),
+    CheckAccess: ('readability/constructors',),
+    CheckSpacing: (
+        'readability/todo', 'whitespace/blank_line', 'whitespace/braces',
+        'whitespace/comments', 'whitespace/forcolon', 'whitespace/todo'),
+    CheckOperatorSpacing: ('whitespace/operators',),
+    CheckParenthesisSpacing: ('whitespace/parens',),
+    CheckCommaSpacing: ('whitespace/comma', 'whitespace/semicolon'),
+    CheckBracesSpacing: ('whitespace/braces', 'whitespace/semicolon'),
+    CheckSpacingForFunctionCall: ('whitespace/parens',),
+    CheckCheck: ('readability/check',),
+    CheckAltTokens: ('readability/alt_tokens',),
+    # the include state is used by CheckForIncludeWhatYouUse and
+    # CheckHeaderFileIncluded
+    CheckLanguage: (
+        'build/include', 'build/include_alpha', 'build/include_order',
+        'build/include_what_you_use', 'build/namespaces',
+        'readability/braces', 'readability/casting', 'runtime/arrays',
+        'runtime/casting', 'runtime/init', 'runtime/int', 'runtime/memset',
+        'runtime/operator', 'runtime/printf', 'runtime/string'),
+    CheckCasts: ('readability/casting', 'runtime/casting'),
+    CheckGlobalStatic: ('runtime/init', 'runtime/string'),
+    CheckPrintf: ('runtime/printf',),
+    CheckForNonConstReference: ('runtime/references',),
+    CheckForNonStandardConstructs: (
+        'build/deprecated', 'build/endif_comment', 'build/forward_decl',
+        'build/printf_format', 'build/storage_class', 'runtime/explicit',
+        'runtime/member_string_references', 'runtime/printf_format'),
+    CheckVlogArguments: ('runtime/vlog',),
+    CheckPosixThreading: ('runtime/threadsafe_fn',),
+    CheckInvalidIncrement: ('runtime/invalid_increment',),
+    CheckMakePairUsesDeduction: ('build/explicit_make_pair',),
+    CheckRedundantVirtual: ('readability/inheritance',),
+    CheckRedundantOverrideOrFinal: ('readability/inheritance',),
+    FlagCxx11Features: ('build/c++11', 'build/c++tr1'),
+    CheckForCopyright: ('legal/copyright',),
+    CheckForHeaderGuard: ('build/header_guard', 'readability/nolint'),
+    CheckForIncludeWhatYouUse: ('build/include_what_you_use',),
+    CheckHeaderFileIncluded: ('build/include',),
+    CheckForBadCharacters: ('readability/nul', 'readability/utf8'),
+    CheckForNewlineAtEOF: ('whitespace/ending_newline',),
+}
+
+
+def UpdateSkippedChecks():
+  """Updates the set of checks which are skipped for the current filters.
+
+  A check is skipped if all the error categories it can report are filtered
+  out, since none of its errors would be printed or counted anyway.
+  """
+  global _skipped_checks
+  filters = tuple(_Filters())
+  skipped = _skipped_checks_by_filters.get(filters)
+  if skipped is None:
+    skipped = frozenset(
+        check for check, categories in _CHECK_CATEGORIES.items()
+        if all(_IsCategoryFiltered(category) for category in categories))
+    _skipped_checks_by_filters[filters] = skipped
+  _skipped_checks = skipped
+  _cpplint_state.skipped_checks.update(check.__name__ for check in skipped)
+
+
 def ProcessFileData(filename, file_extension, lines, error,
                     extra_check_functions=[]):
   """Performs lint checks and reports any errors to the given error function.
@@ -5885,57 +6407,58 @@ def ProcessFileData(filename, file_extension, lines, error,
   nesting_state = NestingState()
 
   ResetNolintSuppressions()
+  UpdateSkippedChecks()
+  skipped = _skipped_checks
 
-  CheckForCopyright(filename, lines, error)
+  if CheckForCopyright not in skipped:
+    CheckForCopyright(filename, lines, error)
   ProcessGlobalSuppresions(lines)
   RemoveMultiLineComments(filename, lines, error)
   clean_lines = CleansedLines(lines)
 
-  if IsHeaderExtension(file_extension):
+  if IsHeaderExtension(file_extension) and CheckForHeaderGuard not in skipped:
     CheckForHeaderGuard(filename, clean_lines, error)
 
+  flag_cxx11_features = FlagCxx11Features not in skipped
   for line in xrange(clean_lines.NumLines()):
     ProcessLine(filename, file_extension, clean_lines, line,
                 include_state, function_state, nesting_state, error,
                 extra_check_functions)
-    FlagCxx11Features(filename, clean_lines, line, error)
+    if flag_cxx11_features:
+      FlagCxx11Features(filename, clean_lines, line, error)
   nesting_state.CheckCompletedBlocks(filename, error)
 
-  CheckForIncludeWhatYouUse(filename, clean_lines, include_state, error)
+  if CheckForIncludeWhatYouUse not in skipped:
+    CheckForIncludeWhatYouUse(filename, clean_lines, include_state, error)
 
   # Check that the .cc file has included its header if it exists.
-  if _IsSourceExtension(file_extension):
+  if (_IsSourceExtension(file_extension) and
+      CheckHeaderFileIncluded not in skipped):
     CheckHeaderFileIncluded(filename, include_state, error)
 
   # We check here rather than inside ProcessLine so that we see raw
   # lines rather than "cleaned" lines.
-  CheckForBadCharacters(filename, lines, error)
+  if CheckForBadCharacters not in skipped:
+    CheckForBadCharacters(filename, lines, error)
 
-  CheckForNewlineAtEOF(filename, lines, error)
+  if CheckForNewlineAtEOF not in skipped:
+    CheckForNewlineAtEOF(filename, lines, error)
 
-def ProcessConfigOverrides(filename):
-  """ Loads the configuration files and processes the config overrides.
-
-  Args:
-    filename: The name of the file being processed by the linter.
+class _ConfigFile(object):
+  """The parsed options of a CPPLINT.cfg file.
 
-  Returns:
-    False if the current |filename| should not be processed further.
+  Attributes:
+    options: A list of (name, value, pattern) tuples in the order of the file
+             where pattern is the compiled regular expression of the
+             exclude_files option.
+    noparent: True if the file contains 'set noparent'.
+    readable: False if the file couldn't be read.
   """
 
-  abs_filename = os.path.abspath(filename)
-  cfg_filters = []
-  keep_looking = True
-  while keep_looking:
-    abs_path, base_name = os.path.split(abs_filename)
-    if not base_name:
-      break  # Reached the root directory.
-
-    cfg_file = os.path.join(abs_path, "CPPLINT.cfg")
-    abs_filename = abs_path
-    if not os.path.isfile(cfg_file):
-      continue
-
+  def __init__(self, cfg_file):
+    self.options = []
+    self.noparent = False
+    self.readable = True
     try:
       with open(cfg_file) as file_handle:
         for line in file_handle:
@@ -5946,45 +6469,106 @@ def ProcessConfigOverrides(filename):
           name, _, val = line.partition('=')
           name = name.strip()
           val = val.strip()
+          pattern = None
           if name == 'set noparent':
-            keep_looking = False
-          elif name == 'filter':
-            cfg_filters.append(val)
+            self.noparent = True
           elif name == 'exclude_files':
-            # When matching exclude_files pattern, use the base_name of
-            # the current file name or the directory name we are processing.
-            # For example, if we are checking for lint errors in /foo/bar/baz.cc
-            # and we found the .cfg file at /foo/CPPLINT.cfg, then the config
-            # file's "exclude_files" filter is meant to be checked against "bar"
-            # and not "baz" nor "bar/baz.cc".
-            if base_name:
-              pattern = re.compile(val)
-              if pattern.match(base_name):
-                sys.stderr.write('Ignoring "%s": file excluded by "%s". '
-                                 'File path component "%s" matches '
-                                 'pattern "%s"\n' %
-                                 (filename, cfg_file, base_name, val))
-                return False
-          elif name == 'linelength':
-            global _line_length
-            try:
-                _line_length = int(val)
-            except ValueError:
-                sys.stderr.write('Line length must be numeric.')
-          elif name == 'root':
-            global _root
-            _root = val
-          elif name == 'headers':
-            ProcessHppHeadersOption(val)
-          else:
-            sys.stderr.write(
-                'Invalid configuration option (%s) in file %s\n' %
-                (name, cfg_file))
-
+            pattern = re.compile(val)
+          self.options.append((name, val, pattern))
     except IOError:
+      self.readable = False
+
+
+# {str, tuple}: a map from directories to the chain of (directory, cfg_file,
+# _ConfigFile) tuples which apply to the files in the directory, starting with
+# the innermost directory.
+_config_chain_cache = {}
+
+
+def _GetConfigChain(directory):
+  """Returns the CPPLINT.cfg files which apply to the files in a directory.
+
+  Each CPPLINT.cfg file is only parsed once and the chain is cached for each
+  directory.  The chain ends with a file containing 'set noparent' or which
+  can't be read.
+  """
+  chain = _config_chain_cache.get(directory)
+  if chain is not None:
+    return chain
+
+  chain = ()
+  keep_looking = True
+  cfg_file = os.path.join(directory, "CPPLINT.cfg")
+  if os.path.isfile(cfg_file):
+    config = _ConfigFile(cfg_file)
+    chain = ((directory, cfg_file, config),)
+    keep_looking = config.readable and not config.noparent
+  parent = os.path.dirname(directory)
+  if keep_looking and parent != directory:
+    chain += _GetConfigChain(parent)
+  _config_chain_cache[directory] = chain
+  return chain
+
+
+def ProcessConfigOverrides(filename):
+  """ Loads the configuration files and processes the config overrides.
+
+  Args:
+    filename: The name of the file being processed by the linter.
+
+  Returns:
+    False if the current |filename| should not be processed further.
+  """
+
+  abs_filename = os.path.abspath(filename)
+  abs_path, base_name = os.path.split(abs_filename)
+  if not base_name:
+    return True  # The root directory.
+
+  cfg_filters = []
+  for cfg_path, cfg_file, config in _GetConfigChain(abs_path):
+    if not config.readable:
       sys.stderr.write(
           "Skipping config file '%s': Can't open for reading\n" % cfg_file)
-      keep_looking = False
+      break
+
+    # The name of the file or directory below the directory of the config
+    # file on the path of the current file.
+    base_name = abs_filename[len(cfg_path):].lstrip(os.sep).split(os.sep, 1)[0]
+    for name, val, pattern in config.options:
+      if name == 'set noparent':
+        pass
+      elif name == 'filter':
+        cfg_filters.append(val)
+      elif name == 'exclude_files':
+        # When matching exclude_files pattern, use the base_name of
+        # the current file name or the directory name we are processing.
+        # For example, if we are checking for lint errors in /foo/bar/baz.cc
+        # and we found the .cfg file at /foo/CPPLINT.cfg, then the config
+        # file's "exclude_files" filter is meant to be checked against "bar"
+        # and not "baz" nor "bar/baz.cc".
+        if base_name:
+          if pattern.match(base_name):
+            sys.stderr.write('Ignoring "%s": file excluded by "%s". '
+                             'File path component "%s" matches '
+                             'pattern "%s"\n' %
+                             (filename, cfg_file, base_name, val))
+            return False
+      elif name == 'linelength':
+        global _line_length
+        try:
+            _line_length = int(val)
+        except ValueError:
+            sys.stderr.write('Line length must be numeric.')
+      elif name == 'root':
+        global _root
+        _root = val
+      elif name == 'headers':
+        ProcessHppHeadersOption(val)
+      else:
+        sys.stderr.write(
+            'Invalid configuration option (%s) in file %s\n' %
+            (name, cfg_file))
 
   # Apply all the accumulated filters in reverse order (top-level directory
   # config options having the least priority).
@@ -5994,6 +6578,38 @@ def ProcessConfigOverrides(filename):
   return True
 
 
+def _SplitLines(text):
+  """Splits the content of a file into lines without the end-of-line sequence.
+
+  Since we are not using universal newline support the trailing '\r'
+  characters of lines with CR-LF endings are removed here.  The common cases
+  of files which uniformly use LF or CR-LF are handled by a single split.
+
+  Args:
+    text: The content of the file.
+
+  Returns:
+    A tuple of the lines, including the extra trailing blank line we get from
+    split(), and the numbers of the lines with CR-LF endings if the file mixes
+    LF and CR-LF endings (otherwise an empty list).
+  """
+  if '\r' not in text:
+    return text.split('\n'), []
+  crlf_count = text.count('\r\n')
+  if crlf_count == text.count('\n') and '\r\r\n' not in text:
+    return text.split('\r\n'), []
+
+  lines = text.split('\n')
+  # The -1 accounts for the extra trailing blank line we get from split()
+  crlf_lines = [linenum for linenum, line in enumerate(lines[:-1], 1)
+                if line.endswith('\r')]
+  for linenum in crlf_lines:
+    lines[linenum - 1] = lines[linenum - 1].rstrip('\r')
+  if len(crlf_lines) == len(lines) - 1:
+    crlf_lines = []
+  return lines, crlf_lines
+
+
 def ProcessFile(filename, vlevel, extra_check_functions=[]):
   """Does google-lint on a single file.
 
@@ -6015,32 +6631,19 @@ def ProcessFile(filename, vlevel, extra_check_functions=[]):
     _RestoreFilters()
     return
 
-  lf_lines = []
-  crlf_lines = []
   try:
-    # Support the UNIX convention of using "-" for stdin.  Note that
-    # we are not opening the file with universal newline support
-    # (which codecs doesn't support anyway), so the resulting lines do
-    # contain trailing '\r' characters if we are reading a file that
-    # has CRLF endings.
-    # If after the split a trailing '\r' is present, it is removed
-    # below.
+    # Support the UNIX convention of using "-" for stdin.
     if filename == '-':
-      lines = codecs.StreamReaderWriter(sys.stdin,
-                                        codecs.getreader('utf8'),
-                                        codecs.getwriter('utf8'),
-                                        'replace').read().split('\n')
+      text = codecs.StreamReaderWriter(sys.stdin,
+                                       codecs.getreader('utf8'),
+                                       codecs.getwriter('utf8'),
+                                       'replace').read()
     else:
-      lines = codecs.open(filename, 'r', 'utf8', 'replace').read().split('\n')
-
-    # Remove trailing '\r'.
-    # The -1 accounts for the extra trailing blank line we get from split()
-    for linenum in range(len(lines) - 1):
-      if lines[linenum].endswith('\r'):
-        lines[linenum] = lines[linenum].rstrip('\r')
-        crlf_lines.append(linenum + 1)
-      else:
-        lf_lines.append(linenum + 1)
+      # Read the bytes at once and decode them in a single call rather than
+      # through a stream reader.
+      with open(filename, 'rb') as f:
+        text = f.read().decode('utf8', 'replace')
+    lines, crlf_lines = _SplitLines(text)
 
   except IOError:
     sys.stderr.write(
@@ -6070,7 +6673,7 @@ def ProcessFile(filename, vlevel, extra_check_functions=[]):
     # We can't depend on os.linesep to determine what the desired
     # end-of-line sequence should be, since that will return the
     # server-side end-of-line sequence.
-    if lf_lines and crlf_lines:
+    if crlf_lines:
       # Warn on every line with CR.  An alternative approach might be to
       # check whether the file is mostly CRLF or just LF, and warn on the
       # minority, we bias toward LF here since most tools prefer LF.
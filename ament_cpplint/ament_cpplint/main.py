@@ -15,6 +15,14 @@
 # limitations under the License.
 
 import argparse
+import codecs
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stderr
+from contextlib import redirect_stdout
+import io
+import itertools
+import multiprocessing
 import os
 import re
 import sys
@@ -23,9 +31,13 @@ from xml.sax.saxutils import escape
 from xml.sax.saxutils import quoteattr
 
 from ament_cpplint import cpplint
+from ament_cpplint.cache import ResultCache
 from ament_cpplint.cpplint import _cpplint_state
 from ament_cpplint.cpplint import ParseArguments
 from ament_cpplint.cpplint import ProcessFile
+from ament_cpplint.profiling import CheckProfile
+from ament_cpplint.profiling import get_check_profiler
+from ament_cpplint.profiling import uninstall_check_profiler
 
 
 # use custom header guard with two underscore between the name parts
@@ -59,6 +71,16 @@ def custom_get_header_guard_cpp_variable(filename):
 
 cpplint.GetHeaderGuardCPPVariable = custom_get_header_guard_cpp_variable
 
+# the original error reporting function of cpplint
+_default_error = cpplint.Error
+# the original function of cpplint reading the includes of other files
+_default_get_include_list = cpplint._GetIncludeList
+
+# the result of checking a single file
+FileResult = namedtuple('FileResult', [
+    'errors', 'error_count', 'errors_by_category', 'skipped_checks', 'check_times',
+    'check_file_time', 'dependencies'])
+
 
 def main(argv=sys.argv[1:]):
     extensions = ['c', 'cc', 'cpp', 'cxx']
@@ -89,6 +111,21 @@ def main(argv=sys.argv[1:]):
     parser.add_argument(
         '--xunit-file',
         help='Generate a xunit compliant XML file')
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='The number of processes used to check the files (0 to use the '
+             'number of CPUs)')
+    parser.add_argument(
+        '--profile-checks',
+        action='store_true',
+        help='Measure the time spent in each check and output a summary (as '
+             'well as a JSON file next to the xunit file)')
+    parser.add_argument(
+        '--cache-file',
+        help='Cache the results of unchanged files in this SQLite database '
+             '(not used with --profile-checks)')
     args = parser.parse_args(argv)
 
     if args.xunit_file:
@@ -124,49 +161,59 @@ def main(argv=sys.argv[1:]):
         print('No files found', file=sys.stderr)
         return 1
 
-    # hook into error reporting
-    import ament_cpplint.cpplint
-    DefaultError = ament_cpplint.cpplint.Error  # noqa: N806
-    report = []
-
-    # invoke cpplint for each root group of files
-    _cpplint_state.ResetErrorCounts()
-    for root in sorted(groups.keys()):
-        files = groups[root]
-
+    # the cpplint arguments for each file of all root groups
+    tasks = []
+    for group in sorted(groups.keys()):
+        root = os.path.abspath(args.root) if args.root else group
         arguments = list(argv)
-        if args.root:
-            root = os.path.abspath(args.root)
         if root:
-            root_arg = '--root=%s' % root
-            arguments.append(root_arg)
-            print("Using '%s' argument" % root_arg)
-        else:
-            print("Not using '--root'")
-        print('')
-        arguments += files
-        filenames = ParseArguments(arguments)
-
-        for filename in filenames:
-            # hook into error reporting
-            errors = []
-
-            def custom_error(filename, linenum, category, confidence, message):
-                if ament_cpplint.cpplint._ShouldPrintError(category, confidence, linenum):
-                    errors.append({
-                        'linenum': linenum,
-                        'category': category,
-                        'confidence': confidence,
-                        'message': message,
-                    })
-                DefaultError(filename, linenum, category, confidence, message)
-            ament_cpplint.cpplint.Error = custom_error
-
-            ProcessFile(filename, _cpplint_state.verbose_level)
-            report.append((filename, errors))
+            arguments.append('--root=%s' % root)
+        tasks += [(group, root, arguments, filename) for filename in groups[group]]
+
+    report = []
+    error_count = 0
+    errors_by_category = {}
+    skipped_checks = set()
+    profile = CheckProfile() if args.profile_checks else None
+    cache = None
+    if args.cache_file and not args.profile_checks:
+        cache = ResultCache(args.cache_file)
+    try:
+        results = lint_files(
+            [(t[2], t[3]) for t in tasks], args.jobs, args.profile_checks, cache)
+        for i, (group, root, _, filename) in enumerate(tasks):
+            if i == 0 or group != tasks[i - 1][0]:
+                if root:
+                    print("Using '--root=%s' argument" % root)
+                else:
+                    print("Not using '--root'")
+                print('')
+
+            result = next(results)
+            # merge the error counts of each file
+            error_count += result.error_count
+            for category, count in result.errors_by_category.items():
+                errors_by_category[category] = errors_by_category.get(category, 0) + count
+            skipped_checks.update(result.skipped_checks)
+            if profile:
+                profile.add_file(filename, result.check_times, result.check_file_time)
+            report.append((filename, result.errors))
             print('')
+    finally:
+        if cache:
+            cache.close()
+        # restore the original checks of cpplint even if linting failed
+        uninstall_check_profiler()
+    _cpplint_state.error_count = error_count
+    _cpplint_state.errors_by_category = errors_by_category
+    _cpplint_state.skipped_checks = skipped_checks
 
     # output summary
+    if cache:
+        print('Cached results used for %d of %d files' % (cache.hits, len(tasks)))
+    if skipped_checks:
+        print('Skipped checks since all their categories are filtered: %s' %
+              ', '.join(sorted(skipped_checks)))
     for category in sorted(_cpplint_state.errors_by_category.keys()):
         count = _cpplint_state.errors_by_category[category]
         print("Category '%s' errors found: %d" % (category, count),
@@ -177,6 +224,10 @@ def main(argv=sys.argv[1:]):
     else:
         print('No problems found')
 
+    if profile:
+        print('')
+        print(profile.get_table())
+
     # generate xunit file
     if args.xunit_file:
         folder_name = os.path.basename(os.path.dirname(args.xunit_file))
@@ -196,9 +247,157 @@ def main(argv=sys.argv[1:]):
         with open(args.xunit_file, 'w') as f:
             f.write(xml)
 
+        if profile:
+            profile.write_json(os.path.join(path, file_name + '.profile.json'))
+
     return 1 if _cpplint_state.error_count else 0
 
 
+def lint_files(tasks, jobs=1, profile_checks=False, cache=None):
+    """
+    Check the files, optionally in parallel using a pool of processes.
+
+    Each task is a tuple of the cpplint arguments and the filename.
+    The results of `lint_file` are yielded in the order of the passed tasks
+    independent of the number of jobs.
+    When using multiple processes the output of each file is buffered in the
+    worker and written once the result of the file is being yielded.
+    If a cache is passed only the files which are not in the cache are checked
+    and the output of the cached files is replayed.
+    """
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+
+    cached_outputs = {}
+    if cache:
+        for index, (arguments, filename) in enumerate(tasks):
+            data = cache.lookup(arguments, filename)
+            if data is not None:
+                cached_outputs[index] = restore_output(data)
+    uncached_tasks = [
+        task for index, task in enumerate(tasks) if index not in cached_outputs]
+
+    outputs = _lint_uncached_files(
+        uncached_tasks, jobs, profile_checks, buffered=cache is not None)
+    for index, (arguments, filename) in enumerate(tasks):
+        output = cached_outputs.pop(index, None)
+        if output is None:
+            output = next(outputs)
+            if cache:
+                cache.store(filename, get_output_data(*output), output[2].dependencies)
+        stdout, stderr, result = output
+        if stdout is not None:
+            sys.stdout.write(stdout)
+            sys.stderr.write(stderr)
+        yield result
+
+
+def _lint_uncached_files(tasks, jobs, profile_checks, buffered):
+    """
+    Yield the output and result of each file.
+
+    The output is None unless it has been buffered.
+    """
+    if jobs < 2 or len(tasks) < 2:
+        for arguments, filename in tasks:
+            if buffered:
+                yield _lint_file_buffered(arguments, filename, profile_checks)
+            else:
+                yield None, None, lint_file(arguments, filename, profile_checks)
+        return
+
+    if multiprocessing.get_start_method() == 'fork':
+        # compile the patterns once so that the forked workers inherit them
+        cpplint._CompileLazyRegexes()
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        # pass multiple files to each worker at once to reduce the IPC overhead
+        chunksize = max(1, len(tasks) // (jobs * 4))
+        arguments, filenames = zip(*tasks)
+        yield from executor.map(
+            _lint_file_buffered, arguments, filenames, itertools.repeat(profile_checks),
+            chunksize=chunksize)
+
+
+def lint_file(arguments, filename, profile_checks=False):
+    """
+    Check a single file using cpplint.
+
+    The cpplint arguments are applied again for every file since cpplint
+    keeps them in module globals which CPPLINT.cfg files can override.
+    Return a FileResult with the reported errors, the error counts, the
+    names of the checks which have been skipped due to the filters and the
+    paths of the headers which have been read.
+    If profiling is enabled it also contains the time spent in each check.
+    """
+    ParseArguments(arguments + [filename])
+    _cpplint_state.ResetErrorCounts()
+    _cpplint_state.skipped_checks = set()
+    profiler = None
+    if profile_checks:
+        profiler = get_check_profiler()
+        profiler.reset()
+
+    # hook into error reporting
+    errors = []
+
+    def custom_error(filename, linenum, category, confidence, message):
+        if cpplint._ShouldPrintError(category, confidence, linenum):
+            errors.append({
+                'linenum': linenum,
+                'category': category,
+                'confidence': confidence,
+                'message': message,
+            })
+        _default_error(filename, linenum, category, confidence, message)
+    cpplint.Error = custom_error
+
+    # record the headers read by cpplint to invalidate cached results
+    dependencies = []
+
+    def custom_get_include_list(filename, io=codecs):
+        dependencies.append(filename)
+        return _default_get_include_list(filename, io)
+    cpplint._GetIncludeList = custom_get_include_list
+    # CheckHeaderFileIncluded probes if the header of a source file exists,
+    # so the result also changes when that header is added or removed
+    if cpplint._IsSourceExtension(os.path.splitext(filename)[1][1:]):
+        dependencies.append(os.path.splitext(filename)[0] + '.h')
+
+    ProcessFile(filename, _cpplint_state.verbose_level)
+    return FileResult(
+        errors, _cpplint_state.error_count, dict(_cpplint_state.errors_by_category),
+        _cpplint_state.skipped_checks,
+        profiler.check_times if profiler else None,
+        profiler.file_time if profiler else None,
+        dependencies)
+
+
+def _lint_file_buffered(arguments, filename, profile_checks):
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    with redirect_stdout(stdout), redirect_stderr(stderr):
+        result = lint_file(arguments, filename, profile_checks)
+    return stdout.getvalue(), stderr.getvalue(), result
+
+
+def get_output_data(stdout, stderr, result):
+    return {
+        'stdout': stdout,
+        'stderr': stderr,
+        'errors': result.errors,
+        'error_count': result.error_count,
+        'errors_by_category': result.errors_by_category,
+        'skipped_checks': sorted(result.skipped_checks),
+    }
+
+
+def restore_output(data):
+    result = FileResult(
+        data['errors'], data['error_count'], data['errors_by_category'],
+        set(data['skipped_checks']), None, None, [])
+    return data['stdout'], data['stderr'], result
+
+
 def get_file_groups(paths, extensions):
     # dict mapping root path to files
     groups = {}
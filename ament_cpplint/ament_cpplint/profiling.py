@@ -0,0 +1,168 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import functools
+import json
+import time
+
+from ament_cpplint import cpplint
+
+# the profiler of the current process, created on demand
+_check_profiler = None
+
+
+class CheckProfiler:
+    """
+    Measure the time spent in each cpplint check.
+
+    The checks of the cpplint check registry are replaced by wrappers in the
+    cpplint module which count the calls and accumulate the time of each check
+    for the current file.
+    The total time of a check includes the time of the checks it invokes,
+    e.g. the total time of CheckStyle includes the time of CheckBraces, while
+    the self time excludes it.
+    """
+
+    def __init__(self):
+        # map check names to a list of the number of calls, the total time
+        # and the self time
+        self.check_times = {}
+        # the time of the checks which aren't invoked by another check
+        self.file_time = 0.0
+        # the time of the checks invoked by each currently running check
+        self._invoked_times = []
+        self._original_checks = dict(cpplint._CHECK_CATEGORIES)
+
+        check_categories = {}
+        for check, categories in self._original_checks.items():
+            wrapper = self._wrap(check)
+            setattr(cpplint, check.__name__, wrapper)
+            check_categories[wrapper] = categories
+        cpplint._CHECK_CATEGORIES = check_categories
+        cpplint._skipped_checks_by_filters.clear()
+
+    def _wrap(self, check):
+        name = check.__name__
+
+        @functools.wraps(check)
+        def wrapper(*args, **kwargs):
+            self._invoked_times.append(0.0)
+            start = time.perf_counter()
+            try:
+                return check(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                self_time = elapsed - self._invoked_times.pop()
+                if self._invoked_times:
+                    self._invoked_times[-1] += elapsed
+                else:
+                    self.file_time += elapsed
+                stats = self.check_times.get(name)
+                if stats is None:
+                    self.check_times[name] = [1, elapsed, self_time]
+                else:
+                    stats[0] += 1
+                    stats[1] += elapsed
+                    stats[2] += self_time
+        return wrapper
+
+    def reset(self):
+        self.check_times = {}
+        self.file_time = 0.0
+
+    def uninstall(self):
+        """Restore the original checks in the cpplint module."""
+        for check in self._original_checks.keys():
+            setattr(cpplint, check.__name__, check)
+        cpplint._CHECK_CATEGORIES = self._original_checks
+        cpplint._skipped_checks_by_filters.clear()
+
+
+def get_check_profiler():
+    """Get the profiler of the current process, installing it if necessary."""
+    global _check_profiler
+    if _check_profiler is None:
+        _check_profiler = CheckProfiler()
+    return _check_profiler
+
+
+def uninstall_check_profiler():
+    global _check_profiler
+    if _check_profiler is not None:
+        _check_profiler.uninstall()
+        _check_profiler = None
+
+
+class CheckProfile:
+    """The accumulated check times of multiple files."""
+
+    def __init__(self):
+        self.checks = {}
+        self.files = {}
+
+    def add_file(self, filename, check_times, file_time):
+        self.files[filename] = file_time
+        for name, values in check_times.items():
+            stats = self.checks.setdefault(name, [0, 0.0, 0.0])
+            for i, value in enumerate(values):
+                stats[i] += value
+
+    def get_categories(self):
+        """
+        Get the self time of the checks which can report each category.
+
+        Since a check can report multiple categories its self time is counted
+        for each of them.
+        """
+        categories_by_name = {
+            check.__name__: categories
+            for check, categories in cpplint._CHECK_CATEGORIES.items()}
+        categories = {}
+        for name, (_, _, self_time) in self.checks.items():
+            for category in categories_by_name.get(name, ()):
+                categories[category] = categories.get(category, 0.0) + self_time
+        return categories
+
+    def get_table(self, max_files=10):
+        lines = ['Check profile:']
+        lines.append('%10s %10s %10s  %s' % ('total [s]', 'self [s]', 'calls', 'check'))
+        for name, (calls, elapsed, self_time) in sort_by_time(
+            self.checks, lambda v: v[2]
+        ):
+            lines.append('%10.3f %10.3f %10d  %s' % (elapsed, self_time, calls, name))
+        lines.append('')
+        lines.append('%10s  %s' % ('self [s]', 'category'))
+        for category, elapsed in sort_by_time(self.get_categories()):
+            lines.append('%10.3f  %s' % (elapsed, category))
+        lines.append('')
+        lines.append('%10s  %s' % ('time [s]', 'file (slowest %d)' % max_files))
+        for filename, elapsed in sort_by_time(self.files)[:max_files]:
+            lines.append('%10.3f  %s' % (elapsed, filename))
+        return '\n'.join(lines)
+
+    def write_json(self, path):
+        data = {
+            'checks': {
+                name: {'calls': calls, 'time': elapsed, 'self_time': self_time}
+                for name, (calls, elapsed, self_time) in self.checks.items()},
+            'files': self.files,
+            'categories': self.get_categories(),
+        }
+        with open(path, 'w') as h:
+            json.dump(data, h, indent=2, sort_keys=True)
+            h.write('\n')
+
+
+def sort_by_time(values, get_time=lambda v: v):
+    return sorted(values.items(), key=lambda item: (-get_time(item[1]), item[0]))
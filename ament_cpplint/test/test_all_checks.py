@@ -0,0 +1,84 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ament_cpplint import cpplint
+from ament_cpplint.main import main
+
+
+sources = {
+    'foo.hpp': (
+        '#ifndef FOO_HPP_\n'
+        '#define FOO_HPP_\n'
+        '\n'
+        '#include <map>\n'
+        '#include <string>\n'
+        '\n'
+        'namespace foo\n'
+        '{\n'
+        'class Foo\n'
+        '{\n'
+        'public:\n'
+        '  Foo(int x);\n'
+        '  void update(\n'
+        '    int & value,\n'
+        '    std::map<std::string, int>& values) const;\n'
+        'private:\n'
+        '  DISALLOW_COPY_AND_ASSIGN(Foo);\n'
+        '};\n'
+        '}  // namespace foo\n'
+        '\n'
+        '#endif  // FOO_HPP_\n'),
+    'foo.cpp': (
+        '#include <stdio.h>\n'
+        '#include "foo.hpp"\n'
+        '#include <vector>\n'
+        'using namespace std;\n'
+        '\n'
+        'namespace foo {\n'
+        'void Foo::update(int& value,\n'
+        '                 std::map<std::string, int>& values) const {\n'
+        '  char buffer[10];\n'
+        '  sprintf(buffer, "%d", value);  // TODO: fix\n'
+        '  if (value) {\n'
+        '    values["a"] = (int)value;\n'
+        '  }\n'
+        '  else {\n'
+        '    std::vector<int> v = {1,2};\n'
+        '    auto p = make_pair<int, int>(1, 2);\n'
+        '  }\n'
+        '  short s = value ;\n'
+        '  long long l = s; \n'
+        '  value = (value + 1)<<2;\n'
+        '}\n'
+        '}\n'),
+}
+
+
+def test_all_checks(tmp_path, capsys):
+    src = tmp_path / 'src'
+    src.mkdir()
+    for filename, content in sources.items():
+        (src / filename).write_text(content)
+
+    # enable all categories including the ones filtered by default
+    filters = ','.join('+' + category for category in cpplint._ERROR_CATEGORIES)
+    rc = main(argv=['--filters=' + filters, str(src)])
+
+    out, err = capsys.readouterr()
+    assert rc == 1
+    for category in (
+        'runtime/references', 'build/include_order', 'readability/casting',
+        'whitespace/braces', 'runtime/printf', 'build/explicit_make_pair',
+    ):
+        assert '[%s]' % category in err, category
@@ -0,0 +1,85 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import ast
+import inspect
+
+from ament_cpplint import cpplint
+
+
+def get_functions():
+    tree = ast.parse(inspect.getsource(cpplint))
+    functions = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            functions.setdefault(node.name, node)
+    return functions
+
+
+def get_reported_categories(functions, name, visited):
+    """Get the categories reported by a function and the functions it calls."""
+    if name in visited:
+        return set()
+    visited.add(name)
+    categories = set()
+    for node in ast.walk(functions[name]):
+        if not isinstance(node, ast.Call):
+            continue
+        func = node.func
+        called = func.id if isinstance(func, ast.Name) else getattr(func, 'attr', None)
+        if called in ('error', 'Error'):
+            # string literals are ast.Str nodes before Python 3.8
+            try:
+                category = ast.literal_eval(node.args[2])
+            except ValueError:
+                category = None
+            assert isinstance(category, str), \
+                "'%s' reports a category which is not a literal" % name
+            categories.add(category)
+        elif called in functions:
+            categories |= get_reported_categories(functions, called, visited)
+    return categories
+
+
+def test_check_categories():
+    functions = get_functions()
+    all_reported = set()
+    for check, categories in cpplint._CHECK_CATEGORIES.items():
+        reported = get_reported_categories(functions, check.__name__, set())
+        all_reported |= reported
+        assert reported <= set(categories), \
+            "'%s' reports unregistered categories: %s" % (
+                check.__name__, ', '.join(sorted(reported - set(categories))))
+        assert set(categories) <= set(cpplint._ERROR_CATEGORIES)
+    # ensure that the reported categories have been found at all
+    assert 'whitespace/tab' in all_reported
+
+
+def test_skipped_checks():
+    filters = list(cpplint._cpplint_state.filters)
+    try:
+        cpplint._SetFilters('-runtime/references')
+        cpplint.UpdateSkippedChecks()
+        assert cpplint.CheckForNonConstReference in cpplint._skipped_checks
+        assert cpplint.CheckStyle not in cpplint._skipped_checks
+
+        cpplint._SetFilters('-whitespace,+whitespace/comma,-readability/braces')
+        cpplint.UpdateSkippedChecks()
+        assert cpplint.CheckBraces in cpplint._skipped_checks
+        assert cpplint.CheckCommaSpacing not in cpplint._skipped_checks
+        # the include state is needed to check the included headers
+        assert cpplint.CheckLanguage not in cpplint._skipped_checks
+    finally:
+        cpplint._cpplint_state.filters = filters
+        cpplint.UpdateSkippedChecks()
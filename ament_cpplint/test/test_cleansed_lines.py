@@ -0,0 +1,93 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import re
+
+from ament_cpplint.cpplint import _RE_PATTERN_CLEANSE_LINE_ESCAPES
+from ament_cpplint.cpplint import _RE_PATTERN_INCLUDE
+from ament_cpplint.cpplint import CleansedLines
+
+
+lines = [
+    '',
+    'int a = 0;  // comment',
+    'const char * s = "a \\"quoted\\" \'string\'";',
+    'const char * s = "http://example.com";  // "comment"',
+    "char c = '\"'; char d = '\\'';",
+    "int i = 1'000'000; int h = 0x12'AB; int b = 0b1'0;",
+    "auto x = 1.5'3; auto y = a'b';",
+    'printf("%s", "unterminated);',
+    "char c = 'unterminated;",
+    '#include "foo/bar.h"  // "quotes"',
+    '#  include <vector>',
+    'f("a", \'b\', "c" "d", \'\\\\\', "\\\\");',
+    'x = "\\x1F\\101\\n" /* "comment" */ + \'\\0\';',
+    'std::string s = u8"a" L"b" U"c";',
+    '"' * 2000,
+    '"a",' * 5000,
+    "'a'," * 5000,
+]
+
+tokens = [
+    '"', '"', "'", "'", '\\', 'a', '1', '0x', '0b', 'F', ' ', ',', '//', '#include ', '_',
+]
+
+
+def collapse_strings(elided):
+    # the previous implementation of CleansedLines._CollapseStrings
+    if _RE_PATTERN_INCLUDE.match(elided):
+        return elided
+    elided = _RE_PATTERN_CLEANSE_LINE_ESCAPES.sub('', elided)
+    collapsed = ''
+    while True:
+        match = re.match(r'^([^\'"]*)([\'"])(.*)$', elided)
+        if not match:
+            collapsed += elided
+            break
+        head, quote, tail = match.groups()
+        if quote == '"':
+            second_quote = tail.find('"')
+            if second_quote >= 0:
+                collapsed += head + '""'
+                elided = tail[second_quote + 1:]
+            else:
+                collapsed += elided
+                break
+        else:
+            if re.search(r'\b(?:0[bBxX]?|[1-9])[0-9a-fA-F]*$', head):
+                match_literal = re.match(r'^((?:\'?[0-9a-zA-Z_])*)(.*)$', "'" + tail)
+                collapsed += head + match_literal.group(1).replace("'", '')
+                elided = match_literal.group(2)
+            else:
+                second_quote = tail.find("'")
+                if second_quote >= 0:
+                    collapsed += head + "''"
+                    elided = tail[second_quote + 1:]
+                else:
+                    collapsed += elided
+                    break
+    return collapsed
+
+
+def test_collapse_strings():
+    for line in lines:
+        assert CleansedLines._CollapseStrings(line) == collapse_strings(line), line
+
+
+def test_collapse_strings_random():
+    rng = random.Random(0)
+    for _ in range(20000):
+        line = ''.join(rng.choice(tokens) for _ in range(rng.randint(1, 20)))
+        assert CleansedLines._CollapseStrings(line) == collapse_strings(line), line
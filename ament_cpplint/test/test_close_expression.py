@@ -0,0 +1,91 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+
+from ament_cpplint.cpplint import CleansedLines
+from ament_cpplint.cpplint import CloseExpression
+from ament_cpplint.cpplint import FindEndOfExpressionInLine
+from ament_cpplint.cpplint import FindStartOfExpressionInLine
+from ament_cpplint.cpplint import Match
+from ament_cpplint.cpplint import ReverseCloseExpression
+
+
+tokens = [
+    '(', ')', '[', ']', '{', '}', '<', '>', ';', ' ', 'a', '<<', '->', ' >= ',
+    'operator', 'operator<', 'operator>', '\n', '\n',
+]
+
+
+def close_expression(clean_lines, linenum, pos):
+    # the previous implementation of CloseExpression scanning line by line
+    line = clean_lines.elided[linenum]
+    if (line[pos] not in '({[<') or Match(r'<[<=]', line[pos:]):
+        return (line, clean_lines.NumLines(), -1)
+    (end_pos, stack) = FindEndOfExpressionInLine(line, pos, [])
+    if end_pos > -1:
+        return (line, linenum, end_pos)
+    while stack and linenum < clean_lines.NumLines() - 1:
+        linenum += 1
+        line = clean_lines.elided[linenum]
+        (end_pos, stack) = FindEndOfExpressionInLine(line, 0, stack)
+        if end_pos > -1:
+            return (line, linenum, end_pos)
+    return (line, clean_lines.NumLines(), -1)
+
+
+def reverse_close_expression(clean_lines, linenum, pos):
+    # the previous implementation of ReverseCloseExpression
+    line = clean_lines.elided[linenum]
+    if line[pos] not in ')}]>':
+        return (line, 0, -1)
+    (start_pos, stack) = FindStartOfExpressionInLine(line, pos, [])
+    if start_pos > -1:
+        return (line, linenum, start_pos)
+    while stack and linenum > 0:
+        linenum -= 1
+        line = clean_lines.elided[linenum]
+        (start_pos, stack) = FindStartOfExpressionInLine(line, len(line) - 1, stack)
+        if start_pos > -1:
+            return (line, linenum, start_pos)
+    return (line, 0, -1)
+
+
+def check_lines(lines, rng):
+    clean_lines = CleansedLines(lines)
+    positions = [
+        (linenum, pos)
+        for linenum, line in enumerate(clean_lines.elided)
+        for pos, char in enumerate(line) if char in '()[]{}<>']
+    # query in random order and repeatedly to use the remembered positions
+    rng.shuffle(positions)
+    for linenum, pos in positions + positions[:len(positions) // 2]:
+        assert CloseExpression(clean_lines, linenum, pos) == \
+            close_expression(clean_lines, linenum, pos), (lines, linenum, pos)
+        assert ReverseCloseExpression(clean_lines, linenum, pos) == \
+            reverse_close_expression(clean_lines, linenum, pos), (lines, linenum, pos)
+    return len(positions)
+
+
+def test_close_expression():
+    rng = random.Random(0)
+    for _ in range(3000):
+        text = ''.join(rng.choice(tokens) for _ in range(rng.randint(1, 40)))
+        check_lines(text.split('\n'), rng)
+
+    # deeply nested blocks
+    lines = ['void f()', '{']
+    lines += ['if (a%d) {' % i for i in range(50)]
+    lines += ['}'] * 51
+    check_lines(lines, rng)
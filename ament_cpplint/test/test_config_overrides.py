@@ -0,0 +1,58 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ament_cpplint import cpplint
+
+
+def get_filters(path):
+    cpplint._SetFilters('')
+    cpplint._BackupFilters()
+    try:
+        if not cpplint.ProcessConfigOverrides(str(path)):
+            return None
+        return cpplint._Filters()
+    finally:
+        cpplint._RestoreFilters()
+
+
+def test_config_chain(tmp_path, capsys):
+    (tmp_path / 'CPPLINT.cfg').write_text('filter=-build/include_order\n')
+    sub = tmp_path / 'pkg' / 'sub'
+    sub.mkdir(parents=True)
+    (tmp_path / 'pkg' / 'CPPLINT.cfg').write_text(
+        'filter=-readability/todo\nexclude_files=gen_.*\nunknown=1\n')
+    standalone = tmp_path / 'standalone'
+    standalone.mkdir()
+    (standalone / 'CPPLINT.cfg').write_text('set noparent\nfilter=-whitespace/tab\n')
+
+    filters = get_filters(sub / 'foo.cpp')
+    # the filters of the parent directories are applied first
+    assert filters[-2:] == ['-build/include_order', '-readability/todo']
+    assert 'Invalid configuration option (unknown)' in capsys.readouterr().err
+
+    # the exclude pattern is matched against the path component below the
+    # directory of the config file
+    assert get_filters(tmp_path / 'pkg' / 'gen_foo.cpp') is None
+    assert get_filters(tmp_path / 'pkg' / 'gen_dir' / 'foo.cpp') is None
+    assert get_filters(sub / 'gen_foo.cpp') is not None
+
+    filters = get_filters(standalone / 'foo.cpp')
+    assert '-whitespace/tab' in filters
+    assert '-build/include_order' not in filters
+
+    # the config files are only parsed once per directory
+    chain = cpplint._GetConfigChain(str(sub))
+    assert [c[0] for c in chain] == [str(tmp_path / 'pkg'), str(tmp_path)]
+    assert cpplint._GetConfigChain(str(sub)) is chain
+    assert cpplint._GetConfigChain(str(tmp_path / 'pkg'))[0][2] is chain[0][2]
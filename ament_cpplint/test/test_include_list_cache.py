@@ -0,0 +1,39 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from ament_cpplint import cpplint
+
+
+def test_include_list_cache(tmp_path):
+    header = tmp_path / 'foo.h'
+    header.write_text('#include <string>\n// #include <map>\n#include "bar.h"\n')
+    path = str(header)
+
+    include_dict = {'string': 1}
+    assert cpplint.UpdateIncludeState(path, include_dict)
+    assert include_dict == {'string': 1, 'bar.h': 3}
+    includes = cpplint._include_list_cache[path][2]
+    assert cpplint._GetIncludeList(path) is includes
+
+    # a modified header is read again
+    header.write_text('#include <vector>\n')
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+    include_dict = {}
+    assert cpplint.UpdateIncludeState(path, include_dict)
+    assert include_dict == {'vector': 1}
+
+    assert not cpplint.UpdateIncludeState(str(tmp_path / 'missing.h'), {})
@@ -0,0 +1,45 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import re
+
+from ament_cpplint.main import main
+
+
+def test_jobs(tmp_path, capsys):
+    for i in range(12):
+        package = tmp_path / 'src' / ('pkg%d' % (i % 3))
+        if not package.exists():
+            package.mkdir(parents=True)
+        # each file reports a different number of errors
+        (package / ('foo%d.cpp' % i)).write_text(
+            '#include <stdio.h>\n'
+            'int foo()\n'
+            '{\n' +
+            '  int x = 0; \n' * i +
+            '  return (int)0.5;\t\n'
+            '}\n')
+    xunit_file = tmp_path / 'cpplint.xunit.xml'
+
+    results = []
+    for jobs in ('1', '3'):
+        rc = main(argv=[
+            '--jobs', jobs, '--xunit-file', str(xunit_file), str(tmp_path / 'src')])
+        out, err = capsys.readouterr()
+        content = xunit_file.read_text(encoding='utf-8')
+        results.append((rc, out, err, re.sub(r'time="[^"]*"', '', content)))
+    assert results[0][0] == 1, 'Found no errors'
+    # the error counts, the order of the errors and the xunit file are the same
+    assert results[0] == results[1]
+    assert 'Total errors found: ' in results[0][2]
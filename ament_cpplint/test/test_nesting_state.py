@@ -0,0 +1,79 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from ament_cpplint.cpplint import _BlockInfo
+from ament_cpplint.cpplint import _ClassInfo
+from ament_cpplint.cpplint import _ExternCInfo
+from ament_cpplint.cpplint import _FunctionState
+from ament_cpplint.cpplint import _IncludeState
+from ament_cpplint.cpplint import _NamespaceInfo
+from ament_cpplint.cpplint import _PreprocessorInfo
+from ament_cpplint.cpplint import CleansedLines
+from ament_cpplint.cpplint import NestingState
+
+
+def innermost_class(nesting_state):
+    # the previous implementation of NestingState.InnermostClass
+    for block in reversed(nesting_state.stack):
+        if isinstance(block, _ClassInfo):
+            return block
+    return None
+
+
+def test_innermost_class():
+    lines = [
+        '',
+        'namespace foo',
+        '{',
+        'class A',
+        '{',
+        '  void f()',
+        '  {',
+        '    struct B;',
+        '#ifdef X',
+        '    struct C {',
+        '#else',
+        '    struct D {',
+        '#endif',
+        '      int c;',
+        '    };',
+        '    if (true) {',
+        '      struct E { int e; };',
+        '    }',
+        '  }',
+        '};',
+        '}  // namespace foo',
+        '',
+    ]
+    clean_lines = CleansedLines(lines)
+    nesting_state = NestingState()
+    names = []
+    for linenum in range(clean_lines.NumLines()):
+        nesting_state.Update('foo.h', clean_lines, linenum, lambda *args: None)
+        classinfo = nesting_state.InnermostClass()
+        assert classinfo is innermost_class(nesting_state), linenum
+        names.append(classinfo.name if classinfo else None)
+    assert names == [
+        None, None, None, 'A', 'A', 'A', 'A', 'A', 'A', 'C', 'A', 'D', 'C', 'C',
+        'A', 'A', 'A', 'A', 'A', None, None, None]
+
+
+def test_state_slots():
+    clean_lines = CleansedLines(['', 'class A {', '};', ''])
+    objects = [
+        _BlockInfo(0, True), _ExternCInfo(0), _ClassInfo('A', 'class', clean_lines, 1),
+        _NamespaceInfo('a', 0), _PreprocessorInfo([]), _FunctionState(), _IncludeState()]
+    for obj in objects:
+        # the state objects don't have a dict since they use slots
+        assert not hasattr(obj, '__dict__'), type(obj).__name__
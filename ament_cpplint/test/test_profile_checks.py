@@ -0,0 +1,64 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+
+from ament_cpplint import cpplint
+import ament_cpplint.main
+from ament_cpplint.main import main
+import pytest
+
+
+def test_profile_checks(tmp_path, capsys):
+    source = tmp_path / 'src' / 'foo.cpp'
+    source.parent.mkdir()
+    source.write_text('int main()\n{\n  return 0;\n}\n')
+    xunit_file = tmp_path / 'results' / 'cpplint.xunit.xml'
+    original_check_style = cpplint.CheckStyle
+
+    main(argv=[
+        '--profile-checks', '--filters=-runtime/references', '--xunit-file',
+        str(xunit_file), str(source)])
+
+    assert 'Check profile:' in capsys.readouterr().out
+    with (tmp_path / 'results' / 'cpplint.profile.json').open() as h:
+        profile = json.load(h)
+    # the four lines, the empty line after the last newline and two markers
+    assert profile['checks']['CheckStyle']['calls'] == 7
+    assert 'CheckForNonConstReference' not in profile['checks']
+    assert list(profile['files'].keys()) == [str(source)]
+    assert 'whitespace/tab' in profile['categories']
+    # the original checks have been restored
+    assert cpplint.CheckStyle is original_check_style
+
+
+def test_profile_checks_failure(tmp_path, monkeypatch):
+    source = tmp_path / 'src' / 'foo.cpp'
+    source.parent.mkdir()
+    source.write_text('int main()\n{\n  return 0;\n}\n')
+    original_check_style = cpplint.CheckStyle
+    original_check_categories = dict(cpplint._CHECK_CATEGORIES)
+
+    def failing_process_file(*args):
+        # the profiler has been installed at this point
+        assert cpplint.CheckStyle is not original_check_style
+        raise RuntimeError('linting failed')
+    monkeypatch.setattr(ament_cpplint.main, 'ProcessFile', failing_process_file)
+
+    with pytest.raises(RuntimeError):
+        main(argv=['--profile-checks', str(source)])
+
+    # the original checks have been restored even though linting failed
+    assert cpplint.CheckStyle is original_check_style
+    assert cpplint._CHECK_CATEGORIES == original_check_categories
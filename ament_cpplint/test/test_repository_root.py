@@ -0,0 +1,45 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from ament_cpplint import cpplint
+
+
+def create_file(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text('')
+    return str(path)
+
+
+def test_repository_name(tmp_path):
+    (tmp_path / 'git_repo' / '.git').mkdir(parents=True)
+    header = create_file(tmp_path / 'git_repo' / 'pkg' / 'include' / 'pkg' / 'foo.h')
+    source = create_file(tmp_path / 'git_repo' / 'pkg' / 'src' / 'foo.cpp')
+    assert cpplint.FileInfo(header).RepositoryName() == 'pkg/include/pkg/foo.h'
+    assert cpplint.FileInfo(source).RepositoryName() == 'pkg/src/foo.cpp'
+    # the ancestors have only been probed once
+    assert cpplint._vcs_dir_cache[str(tmp_path / 'git_repo' / 'pkg')] == \
+        str(tmp_path / 'git_repo')
+
+    # the top of a svn checkout is found from a directory containing .svn
+    (tmp_path / 'svn_repo' / '.svn').mkdir(parents=True)
+    (tmp_path / 'svn_repo' / 'pkg' / '.svn').mkdir(parents=True)
+    source = create_file(tmp_path / 'svn_repo' / 'pkg' / 'foo.cpp')
+    assert cpplint.FileInfo(source).RepositoryName() == os.path.join('pkg', 'foo.cpp')
+
+    # files outside of a repository keep their full name
+    source = create_file(tmp_path / 'no_repo' / 'foo.cpp')
+    if cpplint._GetRepositoryRoot(str(tmp_path / 'no_repo')) is None:
+        assert cpplint.FileInfo(source).RepositoryName() == source
@@ -0,0 +1,120 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from ament_cpplint import cpplint
+from ament_cpplint.cache import ResultCache
+from ament_cpplint.main import main
+
+
+def run_main(tmp_path, capsys, *args):
+    rc = main(argv=[
+        '--cache-file', str(tmp_path / 'build' / 'cpplint.db')] + list(args) + [
+        str(tmp_path / 'src')])
+    out, err = capsys.readouterr()
+    lines = out.splitlines()
+    cached = [line for line in lines if line.startswith('Cached results used')]
+    out = '\n'.join(line for line in lines if line not in cached)
+    return rc, out, err, cached[0]
+
+
+def write(path, content):
+    path.write_text(content)
+    # ensure that the modification is detected independent of the timestamp
+    # resolution of the filesystem
+    stat = os.stat(str(path))
+    os.utime(str(path), (stat.st_atime, stat.st_mtime + 10))
+
+
+def test_result_cache(tmp_path, capsys):
+    (tmp_path / 'src').mkdir()
+    header = tmp_path / 'src' / 'foo.h'
+    write(header, '#include <string>\n')
+    write(tmp_path / 'src' / 'foo.cpp', (
+        '#include "foo.h"\n'
+        '\n'
+        'std::string foo()\n'
+        '{\n'
+        '  return "foo";\t\n'
+        '}\n'))
+
+    first = run_main(tmp_path, capsys)
+    assert first[3] == 'Cached results used for 0 of 2 files'
+    assert 'whitespace/tab' in first[2]
+    second = run_main(tmp_path, capsys)
+    assert second[3] == 'Cached results used for 2 of 2 files'
+    # the output and the error counts are replayed from the cache
+    assert second[:3] == first[:3]
+
+    # the result of the source file depends on the includes of its header
+    write(header, '\n')
+    third = run_main(tmp_path, capsys)
+    assert third[3] == 'Cached results used for 0 of 2 files'
+    assert 'Add #include <string> for string' in third[2]
+
+    # the results depend on the arguments
+    fourth = run_main(tmp_path, capsys, '--filters=-whitespace/tab')
+    assert fourth[3] == 'Cached results used for 0 of 2 files'
+    assert 'whitespace/tab' not in fourth[2]
+    fifth = run_main(tmp_path, capsys)
+    assert fifth[3] == 'Cached results used for 2 of 2 files'
+    assert fifth[:3] == third[:3]
+
+    # the results depend on the CPPLINT.cfg files
+    write(tmp_path / 'src' / 'CPPLINT.cfg', 'filter=-build/include_what_you_use\n')
+    # the config files are only parsed once per process
+    cpplint._config_chain_cache.clear()
+    sixth = run_main(tmp_path, capsys)
+    assert sixth[3] == 'Cached results used for 0 of 2 files'
+    assert 'build/include_what_you_use' not in sixth[2]
+
+
+def test_result_cache_header_probe(tmp_path, capsys):
+    (tmp_path / 'src').mkdir()
+    write(tmp_path / 'src' / 'bar.cpp', 'int bar()\n{\n  return 0;\n}\n')
+    header = tmp_path / 'src' / 'bar.h'
+
+    first = run_main(tmp_path, capsys)
+    assert first[3] == 'Cached results used for 0 of 1 files'
+    assert 'build/include' not in first[2]
+
+    # the result of the source file depends on the existence of its header
+    write(header, 'int bar();\n')
+    second = run_main(tmp_path, capsys)
+    # the header itself is checked as well
+    assert second[3] == 'Cached results used for 0 of 2 files'
+    assert 'bar.cpp should include its header file' in second[2]
+
+    header.unlink()
+    third = run_main(tmp_path, capsys)
+    assert third[3] == 'Cached results used for 0 of 1 files'
+    assert third[:3] == first[:3]
+
+
+def test_result_cache_concurrent(tmp_path, capsys):
+    (tmp_path / 'src').mkdir()
+    write(tmp_path / 'src' / 'bar.cpp', 'int bar()\n{\n  return 0;\n}\n')
+    (tmp_path / 'build').mkdir()
+
+    # another run using the same cache file is still in progress
+    other_cache = ResultCache(str(tmp_path / 'build' / 'cpplint.db'))
+    try:
+        assert other_cache.lookup([], str(tmp_path / 'src' / 'bar.cpp')) is None
+        first = run_main(tmp_path, capsys)
+        assert first[3] == 'Cached results used for 0 of 1 files'
+    finally:
+        other_cache.close()
+    second = run_main(tmp_path, capsys)
+    assert second[3] == 'Cached results used for 1 of 1 files'
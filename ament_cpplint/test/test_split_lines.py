@@ -0,0 +1,44 @@
+# Copyright 2026 Open Source Robotics Foundation, Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+
+from ament_cpplint import cpplint
+
+
+def split_lines(text):
+    """Split the lines the way cpplint used to do it line by line."""
+    lines = text.split('\n')
+    lf_lines = []
+    crlf_lines = []
+    for linenum in range(len(lines) - 1):
+        if lines[linenum].endswith('\r'):
+            lines[linenum] = lines[linenum].rstrip('\r')
+            crlf_lines.append(linenum + 1)
+        else:
+            lf_lines.append(linenum + 1)
+    return lines, crlf_lines if lf_lines else []
+
+
+def test_split_lines():
+    texts = [
+        '', '\n', '\r\n', '\r', 'a', 'a\n', 'a\r\n', 'a\r\nb', 'a\r\nb\r',
+        'a\nb\r\n', 'a\r\r\nb\r\n', 'a\r\r\nb\n', 'a\rb\r\n', '\r\r\n\r\n',
+    ]
+    rng = random.Random(0)
+    for _ in range(10000):
+        texts.append(''.join(
+            rng.choice(['a', ' ', '\r', '\n', '\r\n', '\r\n', '\n']) for _ in range(8)))
+    for text in texts:
+        assert cpplint._SplitLines(text) == split_lines(text), repr(text)